@@ -0,0 +1,53 @@
+"""
+Benchmarks of the comparison subpackage.
+"""
+
+import random
+
+from docomp.comparison import SectionsIndex, find_differences
+
+
+def make_document(n_sections, n_words=200, seed=0, change_rate=0.0):
+    """Generate a synthetic HTML document with enumerated sections."""
+    random_state = random.Random(seed)
+    words = [f'word{index}' for index in range(1000)]
+    html = []
+    for index in range(n_sections):
+        html.append(f'<p><b>{index + 1}. SECTION TITLE {index + 1}</b></p>')
+        section_words = random.Random(index).choices(words, k=n_words)
+        section_words = [
+            'changed' if random_state.random() < change_rate else word
+            for word in section_words
+        ]
+        html.append(f'<p>{" ".join(section_words)}</p>')
+    return ''.join(html)
+
+
+class DifferencesSuite:
+    """Benchmark the differences of documents."""
+
+    params = [10, 100, 1000]
+    param_names = ['n_sections']
+
+    def setup(self, n_sections):
+        self.document = make_document(n_sections)
+        self.reference = make_document(n_sections, seed=1, change_rate=0.05)
+
+    def time_find_differences(self, n_sections):
+        find_differences(self.document, self.reference)
+
+
+class IndexingSuite:
+    """Benchmark the queries of the sections index."""
+
+    params = [100, 1000, 10000]
+    param_names = ['n_sections']
+
+    def setup(self, n_sections):
+        self.index = SectionsIndex()
+        for index in range(n_sections):
+            self.index.add_html(index, make_document(1, seed=index, change_rate=0.1))
+        self.document = make_document(1, seed=n_sections, change_rate=0.1)
+
+    def time_query(self, n_sections):
+        self.index.query(self.document)
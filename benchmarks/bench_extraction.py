@@ -0,0 +1,81 @@
+"""
+Benchmarks of the EPAR extraction module.
+"""
+
+from os.path import dirname, join
+from timeit import timeit
+
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams
+
+from docomp.content._epar._extraction import LabellingHTMLExtractor, PageIndex
+
+EXTRACTION_PATH = join(
+    dirname(dirname(__file__)),
+    'docomp',
+    'content',
+    '_epar',
+    'tests',
+    'resources',
+    'extraction',
+)
+
+
+def make_labelling_subsections(n_items):
+    """Generate a synthetic labelling section with enumerated items."""
+    subsections = []
+    for index in range(n_items):
+        subsections.append(
+            [
+                f'{index + 1}. ENUMERATED TITLE {index + 1}',
+                'Text of the item',
+                f'{index + 2}. INTERNAL TITLE {index + 2}',
+                f'Text of the item {index + 1} |',
+            ]
+        )
+    return subsections
+
+
+class SplitSubsectionsSuite:
+    """Benchmark the split of labelling subsections."""
+
+    params = [100, 1000, 10000]
+    param_names = ['n_items']
+
+    def setup(self, n_items):
+        self.subsections = make_labelling_subsections(n_items)
+
+    def time_split_subsections(self, n_items):
+        LabellingHTMLExtractor._split_subsections(self.subsections)
+
+
+class PageIndexSuite:
+    """Benchmark the indexing of the parsed pages."""
+
+    params = ['azarga', 'evista']
+    param_names = ['product']
+
+    def setup(self, product):
+        self.pages = list(
+            extract_pages(
+                join(EXTRACTION_PATH, f'{product}_en.pdf'),
+                laparams=LAParams(boxes_flow=None, char_margin=10.0),
+            )
+        )
+
+    def time_index_pages(self, product):
+        [PageIndex(page) for page in self.pages]
+
+    def mem_pages(self, product):
+        return self.pages
+
+    def mem_pages_indexes(self, product):
+        return [PageIndex(page) for page in self.pages]
+
+
+if __name__ == '__main__':
+    suite = SplitSubsectionsSuite()
+    for n_items in SplitSubsectionsSuite.params:
+        suite.setup(n_items)
+        duration = timeit(lambda: suite.time_split_subsections(n_items), number=10)
+        print(f'n_items={n_items}: {duration / 10:.6f}s')
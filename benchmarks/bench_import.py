@@ -0,0 +1,13 @@
+"""
+Benchmarks of the import time of the package.
+"""
+
+
+class ImportSuite:
+    """Benchmark the import of the package and its subpackages."""
+
+    params = ['docomp', 'docomp.content', 'docomp.comparison']
+    param_names = ['package']
+
+    def timeraw_import(self, package):
+        return f'import {package}'
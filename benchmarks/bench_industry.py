@@ -0,0 +1,68 @@
+"""
+Benchmarks of the industry extraction module.
+"""
+
+from os.path import dirname, join
+from tempfile import mkdtemp
+from zipfile import ZipFile
+
+from docomp.content import extract_industry_content
+
+RESOURCES_PATH = join(
+    dirname(dirname(__file__)), 'docomp', 'content', '_industry', 'tests', 'resources'
+)
+
+
+def make_docx(path, n_pages, n_paragraphs=40):
+    """Generate a synthetic docx document with bold titles and text."""
+    paragraphs = []
+    for page in range(n_pages):
+        paragraphs.append(
+            '<w:p><w:r><w:br w:type="page"/></w:r><w:r><w:rPr><w:b/></w:rPr>'
+            f'<w:t>{page + 1}. SECTION TITLE</w:t></w:r></w:p>'
+        )
+        paragraphs += [
+            f'<w:p><w:r><w:t>Text of the paragraph {index}</w:t></w:r></w:p>'
+            for index in range(n_paragraphs)
+        ]
+    with ZipFile(path, 'w') as docx_file:
+        docx_file.writestr(
+            'word/document.xml',
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+            'wordprocessingml/2006/main"><w:body>'
+            + ''.join(paragraphs)
+            + '</w:body></w:document>',
+        )
+    return path
+
+
+class PDFExtractionSuite:
+    """Benchmark the extraction of industry pdf documents."""
+
+    params = ['azarga', 'evista']
+    param_names = ['product']
+
+    def setup(self, product):
+        self.path = join(RESOURCES_PATH, f'{product}_en_leaflet.pdf')
+
+    def time_extract(self, product):
+        extract_industry_content(self.path)
+
+    def peakmem_extract(self, product):
+        extract_industry_content(self.path)
+
+
+class DOCXExtractionSuite:
+    """Benchmark the extraction of industry docx documents."""
+
+    params = [10, 100, 1000]
+    param_names = ['n_pages']
+
+    def setup(self, n_pages):
+        self.path = make_docx(join(mkdtemp(), 'document.docx'), n_pages)
+
+    def time_extract(self, n_pages):
+        extract_industry_content(self.path)
+
+    def peakmem_extract(self, n_pages):
+        extract_industry_content(self.path)
@@ -0,0 +1,216 @@
+"""
+Benchmarks of the stages of the EPAR pipeline.
+
+Each stage is measured for wall time, peak resident memory and peak traced
+allocations, offline against the fixture documents and against synthetic
+documents that scale up the sections of the fixtures.
+"""
+
+import tracemalloc
+from os.path import dirname, join
+from pathlib import Path
+from timeit import timeit
+
+from docomp.content._images import ImageStore
+from docomp.content._epar._downloading import EPARDownloader
+from docomp.content._epar._extraction import (
+    ImagesExtractor,
+    LabellingHTMLExtractor,
+    PageIndex,
+    SectionExtractor,
+    index_page,
+)
+
+RESOURCES_PATH = join(
+    dirname(dirname(__file__)), 'docomp', 'content', '_epar', 'tests', 'resources'
+)
+DOWNLOADING_PATH = join(RESOURCES_PATH, 'downloading', '{}_sections_en.pdf')
+EXTRACTION_PATH = join(RESOURCES_PATH, 'extraction', '{}_en.pdf')
+PRODUCTS = ['azarga', 'evista']
+SCALES = [1, 10, 100]
+
+
+class OfflineEPARDownloader(EPARDownloader):
+    """Downloader of the fixture documents."""
+
+    CACHE_PATH_ = None
+
+    def __init__(self, product, path=DOWNLOADING_PATH):
+        super(OfflineEPARDownloader, self).__init__(product)
+        self.path = path
+
+    @property
+    def download_url_(self):
+        return Path(self.path.format(self.product)).resolve().as_uri()
+
+
+class TextLinesEPARDownloader(OfflineEPARDownloader):
+    """Downloader of the fixture documents with the text lines device."""
+
+    DEVICE_ = 'text_lines'
+
+
+def measure_allocations(func, *args):
+    """Measure the peak of the traced allocations of a function call."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def copy_page(page, pageid):
+    """Copy a page index with a different page id and page number."""
+    _, text, bboxes, flags, image = page.__getstate__()
+    text = [
+        part.replace(str(page.pageid), str(pageid))
+        if part.strip() == str(page.pageid)
+        else part
+        for part in text
+    ]
+    copied_page = PageIndex.__new__(PageIndex)
+    copied_page.__setstate__((pageid, text, bboxes, flags, image))
+    return copied_page
+
+
+def scale_pages(pages, scale):
+    """Generate a synthetic document by repeating the sections pages."""
+    pages = [index_page(page) for page in pages]
+    first_num, second_num = SectionExtractor().find_sections_nums(pages)
+    pageids = [page.pageid for page in pages]
+    first_index, second_index = pageids.index(first_num), pageids.index(second_num)
+    sections_pages = (
+        pages[:first_index + 1]
+        + pages[first_index + 1: second_index] * scale
+        + [pages[second_index]]
+        + pages[second_index + 1:] * scale
+    )
+    return [
+        copy_page(page, pageid)
+        for pageid, page in enumerate(sections_pages, start=pages[0].pageid)
+    ]
+
+
+class DownloadSuite:
+    """Benchmark the parsing of the downloaded documents."""
+
+    params = PRODUCTS
+    param_names = ['product']
+    timeout = 120
+
+    def setup(self, product):
+        self.downloader = OfflineEPARDownloader(product)
+        self.text_lines_downloader = TextLinesEPARDownloader(product)
+        self.result = self.downloader.retrieve()
+
+    def time_retrieve(self, product):
+        OfflineEPARDownloader(product).retrieve()
+
+    def time_iter_pages(self, product):
+        list(self.downloader.iter_pages(*self.result))
+
+    def peakmem_iter_pages(self, product):
+        list(self.downloader.iter_pages(*self.result))
+
+    def track_allocations_iter_pages(self, product):
+        return measure_allocations(
+            lambda: list(self.downloader.iter_pages(*self.result))
+        )
+
+    def time_iter_pages_text_lines(self, product):
+        list(self.text_lines_downloader.iter_pages(*self.result))
+
+    def peakmem_iter_pages_text_lines(self, product):
+        list(self.text_lines_downloader.iter_pages(*self.result))
+
+    def track_allocations_iter_pages_text_lines(self, product):
+        return measure_allocations(
+            lambda: list(self.text_lines_downloader.iter_pages(*self.result))
+        )
+
+    track_allocations_iter_pages.unit = 'bytes'
+    track_allocations_iter_pages_text_lines.unit = 'bytes'
+
+
+class ExtractionSuite:
+    """Benchmark the section, HTML and images extraction stages."""
+
+    params = (PRODUCTS, SCALES)
+    param_names = ['product', 'scale']
+    timeout = 120
+
+    def setup_cache(self):
+        return {
+            product: OfflineEPARDownloader(product, EXTRACTION_PATH).download()
+            for product in PRODUCTS
+        }
+
+    def setup(self, pages_mapping, product, scale):
+        self.pages = scale_pages(pages_mapping[product], scale)
+        self.labelling_pages, _ = SectionExtractor(self.pages).extract()
+
+    def time_section_extractor(self, pages_mapping, product, scale):
+        SectionExtractor(self.pages).extract()
+
+    def time_labelling_html_extractor(self, pages_mapping, product, scale):
+        LabellingHTMLExtractor(self.labelling_pages).extract()
+
+    def time_images_extractor(self, pages_mapping, product, scale):
+        ImagesExtractor(self.pages, ImageStore()).extract()
+
+    def peakmem_section_extractor(self, pages_mapping, product, scale):
+        SectionExtractor(self.pages).extract()
+
+    def peakmem_labelling_html_extractor(self, pages_mapping, product, scale):
+        LabellingHTMLExtractor(self.labelling_pages).extract()
+
+    def peakmem_images_extractor(self, pages_mapping, product, scale):
+        ImagesExtractor(self.pages, ImageStore()).extract()
+
+    def track_allocations_section_extractor(self, pages_mapping, product, scale):
+        return measure_allocations(SectionExtractor(self.pages).extract)
+
+    def track_allocations_labelling_html_extractor(self, pages_mapping, product, scale):
+        return measure_allocations(LabellingHTMLExtractor(self.labelling_pages).extract)
+
+    def track_allocations_images_extractor(self, pages_mapping, product, scale):
+        return measure_allocations(ImagesExtractor(self.pages, ImageStore()).extract)
+
+    track_allocations_section_extractor.unit = 'bytes'
+    track_allocations_labelling_html_extractor.unit = 'bytes'
+    track_allocations_images_extractor.unit = 'bytes'
+
+
+if __name__ == '__main__':
+    download_suite = DownloadSuite()
+    extraction_suite = ExtractionSuite()
+    pages_mapping = extraction_suite.setup_cache()
+    for product in PRODUCTS:
+        download_suite.setup(product)
+        for stage in ('iter_pages', 'iter_pages_text_lines'):
+            duration = timeit(
+                lambda: getattr(download_suite, f'time_{stage}')(product), number=1
+            )
+            allocations = getattr(download_suite, f'track_allocations_{stage}')(
+                product
+            )
+            print(
+                f'product={product} stage={stage}: {duration:.6f}s '
+                f'{allocations / 2**20:.2f}MiB'
+            )
+        for scale in SCALES:
+            extraction_suite.setup(pages_mapping, product, scale)
+            for stage in ('section', 'labelling_html', 'images'):
+                time_stage = getattr(extraction_suite, f'time_{stage}_extractor')
+                track_stage = getattr(
+                    extraction_suite, f'track_allocations_{stage}_extractor'
+                )
+                duration = timeit(
+                    lambda: time_stage(pages_mapping, product, scale), number=1
+                )
+                allocations = track_stage(pages_mapping, product, scale)
+                print(
+                    f'product={product} scale={scale} stage={stage}: '
+                    f'{duration:.6f}s {allocations / 2**20:.2f}MiB'
+                )
@@ -14,10 +14,28 @@ comparison
     Module which provides the functions and classes to compare the documents.
 """
 
-import confuse
+from importlib import import_module
 
 from ._version import __version__
 
 __all__ = ['__version__']
 
-CONFIG = confuse.Configuration('document-comparison', __name__)
+SUBPACKAGES = ('content', 'comparison')
+
+
+def __getattr__(name):
+    """Create the configuration and import the subpackages on first access."""
+    if name == 'CONFIG':
+        import confuse
+
+        value = confuse.LazyConfig('document-comparison', __name__)
+    elif name in SUBPACKAGES:
+        value = import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | {'CONFIG', *SUBPACKAGES})
@@ -2,3 +2,27 @@
 The :mod:`docomp.comparison` provides the tools to compare leaflet and
 labelling documents from the industry and EMA.
 """
+
+from importlib import import_module
+
+MODULES_MAPPING = {
+    'SimilarityScorer': '._scoring',
+    'SectionDifferences': '._differences',
+    'find_differences': '._differences',
+    'SectionsIndex': '._indexing',
+}
+
+__all__ = list(MODULES_MAPPING)
+
+
+def __getattr__(name):
+    """Import the classes and their dependencies on first access."""
+    if name in MODULES_MAPPING:
+        value = getattr(import_module(MODULES_MAPPING[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,3 +1,179 @@
 """
 Includes classes and functions to highlight the differences between documents.
 """
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+from collections import namedtuple
+
+from ._utils import extract_sections
+
+SectionDifferences = namedtuple(
+    'SectionDifferences', ['title', 'tokens', 'reference_tokens', 'opcodes']
+)
+SectionDifferences.__doc__ = """Differences of a section of a document from the
+aligned section of a reference.
+
+The opcodes are the ``(tag, start, end, reference_start, reference_end)``
+tuples of the token spans that are inserted, deleted or replaced."""
+
+
+def _find_middle_snake(a, a_start, a_end, b, b_start, b_end):
+    """Find the middle snake of the shortest edit script of two sequences."""
+    n, m = a_end - a_start, b_end - b_start
+    delta = n - m
+    is_odd = delta % 2 == 1
+    max_d = (n + m + 1) // 2
+    forward, backward = [0] * (2 * max_d + 3), [0] * (2 * max_d + 3)
+    for d in range(max_d + 1):
+
+        # Forward paths
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[k - 1] < forward[k + 1]):
+                x = forward[k + 1]
+            else:
+                x = forward[k - 1] + 1
+            y = x - k
+            x_start, y_start = x, y
+            while x < n and y < m and a[a_start + x] == b[b_start + y]:
+                x, y = x + 1, y + 1
+            forward[k] = x
+            if is_odd and delta - d < k < delta + d and x + backward[delta - k] >= n:
+                return a_start + x_start, b_start + y_start, a_start + x, b_start + y
+
+        # Backward paths
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[k - 1] < backward[k + 1]):
+                x = backward[k + 1]
+            else:
+                x = backward[k - 1] + 1
+            y = x - k
+            x_start, y_start = x, y
+            while x < n and y < m and a[a_end - x - 1] == b[b_end - y - 1]:
+                x, y = x + 1, y + 1
+            backward[k] = x
+            if not is_odd and -d <= delta - k <= d and x + forward[delta - k] >= n:
+                return a_end - x, b_end - y, a_end - x_start, b_end - y_start
+
+
+def _find_matches(a, a_start, a_end, b, b_start, b_end, matches):
+    """Find the matching items of two sequences in linear space."""
+
+    # Common prefix
+    while a_start < a_end and b_start < b_end and a[a_start] == b[b_start]:
+        matches.append((a_start, b_start))
+        a_start, b_start = a_start + 1, b_start + 1
+
+    # Common suffix
+    suffix_matches = []
+    while a_start < a_end and b_start < b_end and a[a_end - 1] == b[b_end - 1]:
+        a_end, b_end = a_end - 1, b_end - 1
+        suffix_matches.append((a_end, b_end))
+
+    # Divide on the middle snake
+    if a_start < a_end and b_start < b_end:
+        x, y, u, v = _find_middle_snake(a, a_start, a_end, b, b_start, b_end)
+        _find_matches(a, a_start, x, b, b_start, y, matches)
+        matches.extend(zip(range(x, u), range(y, v)))
+        _find_matches(a, u, a_end, b, v, b_end, matches)
+
+    matches.extend(reversed(suffix_matches))
+
+
+def diff(a, b):
+    """Find the differences of two sequences with Myers' linear space algorithm.
+
+    Returns the ``(tag, a_start, a_end, b_start, b_end)`` opcodes of the
+    inserted, deleted and replaced spans.
+    """
+
+    # Map items to integers for fast comparisons
+    items = {}
+    a = [items.setdefault(item, len(items)) for item in a]
+    b = [items.setdefault(item, len(items)) for item in b]
+
+    matches = []
+    _find_matches(a, 0, len(a), b, 0, len(b), matches)
+    matches.append((len(a), len(b)))
+
+    opcodes = []
+    a_index = b_index = 0
+    for a_match, b_match in matches:
+        if a_index < a_match or b_index < b_match:
+            if a_index == a_match:
+                tag = 'insert'
+            elif b_index == b_match:
+                tag = 'delete'
+            else:
+                tag = 'replace'
+            opcodes.append((tag, a_index, a_match, b_index, b_match))
+        a_index, b_index = a_match + 1, b_match + 1
+    return opcodes
+
+
+def _normalize_title(title):
+    """Normalize a section title for alignment."""
+    return ' '.join(title.split()).lower()
+
+
+def find_differences(document, reference):
+    """Find the differences of the HTML document from the reference.
+
+    Sections are first aligned on their titles and then their tokens are
+    compared only within aligned sections, so that the cost is proportional to
+    the size of the sections. Sections without an aligned section are entirely
+    deleted or inserted.
+
+    Parameters
+    ----------
+    document : str
+        The HTML content of the document.
+    reference : str
+        The HTML content of the reference document.
+
+    Returns
+    -------
+    differences : list of SectionDifferences
+        The differences of the sections that are not identical, in the order of
+        the aligned sections.
+    """
+
+    # Align sections on titles
+    sections, reference_sections = (
+        extract_sections(document),
+        extract_sections(reference),
+    )
+    titles_opcodes = diff(
+        [_normalize_title(section[0]) for section in sections],
+        [_normalize_title(section[0]) for section in reference_sections],
+    )
+    aligned_sections = []
+    index = reference_index = 0
+    for _, start, end, reference_start, reference_end in titles_opcodes + [
+        ('equal', len(sections), None, len(reference_sections), None)
+    ]:
+        aligned_sections += zip(
+            sections[index:start], reference_sections[reference_index:reference_start]
+        )
+        aligned_sections += [(section, None) for section in sections[start:end]]
+        aligned_sections += [
+            (None, section)
+            for section in reference_sections[reference_start:reference_end]
+        ]
+        index, reference_index = end, reference_end
+
+    # Compare tokens of aligned sections
+    differences = []
+    for section, reference_section in aligned_sections:
+        tokens = ' '.join(section).split() if section else []
+        reference_tokens = (
+            ' '.join(reference_section).split() if reference_section else []
+        )
+        opcodes = diff(tokens, reference_tokens)
+        if opcodes:
+            title = (section or reference_section)[0]
+            differences.append(
+                SectionDifferences(title, tokens, reference_tokens, opcodes)
+            )
+
+    return differences
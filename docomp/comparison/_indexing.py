@@ -0,0 +1,145 @@
+"""
+Includes classes and functions to index documents sections for similarity search.
+"""
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+import pickle
+from zlib import crc32
+
+import numpy as np
+
+from ._utils import extract_sections, tokenize
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+class SectionsIndex:
+    """Class to index sections with MinHash signatures and locality sensitive
+    hashing.
+
+    Each section is represented by the MinHash signature of its word n-grams.
+    The signatures are split into bands and sections that share a band are
+    the candidates of a query, so that queries do not scan the whole index.
+    Candidates are ranked by the estimated Jaccard similarity.
+
+    Parameters
+    ----------
+    n_permutations : int, default=128
+        The size of the MinHash signatures.
+    n_bands : int, default=32
+        The number of bands of the signatures. It should divide
+        ``n_permutations``.
+    ngram_size : int, default=2
+        The size of the word n-grams.
+    random_state : int, default=0
+        The seed of the hash permutations.
+    """
+
+    def __init__(self, n_permutations=128, n_bands=32, ngram_size=2, random_state=0):
+        self.n_permutations = n_permutations
+        self.n_bands = n_bands
+        self.ngram_size = ngram_size
+        self.random_state = random_state
+        if n_permutations % n_bands != 0:
+            raise ValueError(
+                f'Parameter `n_bands` should divide `n_permutations`. '
+                f'Got {n_bands} and {n_permutations} instead.'
+            )
+        generator = np.random.RandomState(random_state)
+        self.coefficients_ = generator.randint(
+            1, MERSENNE_PRIME, size=(2, n_permutations, 1)
+        ).astype(np.uint64)
+        self.signatures_ = {}
+        self.buckets_ = [{} for _ in range(n_bands)]
+
+    def __len__(self):
+        return len(self.signatures_)
+
+    def __contains__(self, key):
+        return key in self.signatures_
+
+    def _hash_ngrams(self, text):
+        """Hash the word n-grams of the text."""
+        tokens = tokenize(text)
+        ngrams = {
+            ' '.join(ngram)
+            for ngram in zip(*[tokens[i:] for i in range(self.ngram_size)])
+        } or {' '.join(tokens)}
+        return np.array([crc32(ngram.encode()) for ngram in ngrams], dtype=np.uint64)
+
+    def signature(self, text):
+        """Calculate the MinHash signature of a text."""
+        multipliers, increments = self.coefficients_
+        hashes = (multipliers * self._hash_ngrams(text) + increments) % MERSENNE_PRIME
+        return hashes.min(axis=1)
+
+    def _bands_keys(self, signature):
+        """Split the signature to the keys of its bands."""
+        return [band.tobytes() for band in np.split(signature, self.n_bands)]
+
+    def add(self, key, text):
+        """Add or replace a section of the index."""
+        if key in self.signatures_:
+            self.remove(key)
+        signature = self.signatures_[key] = self.signature(text)
+        for buckets, band_key in zip(self.buckets_, self._bands_keys(signature)):
+            buckets.setdefault(band_key, set()).add(key)
+        return self
+
+    def add_html(self, key, html):
+        """Add the sections of the HTML content with keys ``(*key, index)``."""
+        if not isinstance(key, tuple):
+            key = (key,)
+        for index, section in enumerate(extract_sections(html)):
+            self.add((*key, index), ' '.join(section))
+        return self
+
+    def remove(self, key):
+        """Remove a section from the index."""
+        signature = self.signatures_.pop(key)
+        for buckets, band_key in zip(self.buckets_, self._bands_keys(signature)):
+            bucket = buckets[band_key]
+            bucket.discard(key)
+            if not bucket:
+                del buckets[band_key]
+        return self
+
+    def query(self, text, n_neighbors=5):
+        """Find the indexed sections that are most similar to a text.
+
+        Returns the ``(key, similarity)`` pairs of at most ``n_neighbors``
+        candidates sorted by decreasing estimated Jaccard similarity.
+        """
+        signature = self.signature(text)
+        candidates = set()
+        for buckets, band_key in zip(self.buckets_, self._bands_keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+        if not candidates:
+            return []
+        candidates = list(candidates)
+        similarities = (
+            np.array([self.signatures_[key] for key in candidates]) == signature
+        ).mean(axis=1)
+        order = np.argsort(-similarities, kind='stable')[:n_neighbors]
+        return [(candidates[index], float(similarities[index])) for index in order]
+
+    def save(self, path):
+        """Save the index to a file."""
+        params = (self.n_permutations, self.n_bands, self.ngram_size, self.random_state)
+        keys = list(self.signatures_)
+        signatures = np.array([self.signatures_[key] for key in keys])
+        with open(path, 'wb') as index_file:
+            pickle.dump((params, keys, signatures), index_file)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index from a file."""
+        with open(path, 'rb') as index_file:
+            params, keys, signatures = pickle.load(index_file)
+        index = cls(*params)
+        for key, signature in zip(keys, signatures):
+            index.signatures_[key] = signature
+            for buckets, band_key in zip(index.buckets_, index._bands_keys(signature)):
+                buckets.setdefault(band_key, set()).add(key)
+        return index
@@ -1,3 +1,130 @@
 """
 Includes classes and functions to calculate a score of differences between documents.
 """
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+
+from ._utils import extract_sections, tokenize
+
+
+class SimilarityScorer:
+    """Class to score the similarity of a document against many references.
+
+    Sections are represented as sparse vectors of word n-grams counts and the
+    cosine similarities of all sections are computed with a single sparse
+    matrix product.
+
+    Parameters
+    ----------
+    ngram_range : tuple, default=(1, 2)
+        The minimum and maximum size of the word n-grams.
+    """
+
+    def __init__(self, ngram_range=(1, 2)):
+        self.ngram_range = ngram_range
+
+    def _extract_ngrams(self, text):
+        """Extract the word n-grams of the text."""
+        tokens = tokenize(text)
+        min_n, max_n = self.ngram_range
+        ngrams = []
+        for n in range(min_n, max_n + 1):
+            ngrams += [
+                ' '.join(ngram) for ngram in zip(*[tokens[i:] for i in range(n)])
+            ]
+        return ngrams
+
+    def _vectorize(self, sections):
+        """Build the sparse matrix of n-grams counts of the sections."""
+        vocabulary = self.vocabulary_
+        indices, indptr = [], [0]
+        for section in sections:
+            for ngram in self._extract_ngrams(' '.join(section)):
+                indices.append(vocabulary.setdefault(ngram, len(vocabulary)))
+            indptr.append(len(indices))
+        counts = csr_matrix(
+            (np.ones(len(indices)), indices, indptr),
+            shape=(len(sections), len(vocabulary)),
+        )
+        counts.sum_duplicates()
+        return counts
+
+    @staticmethod
+    def _group(counts, offsets):
+        """Sum the rows of the counts matrix for each group of rows."""
+        sizes = np.diff(offsets)
+        indicator = csr_matrix(
+            (np.ones(counts.shape[0]), np.arange(counts.shape[0]), offsets),
+            shape=(sizes.size, counts.shape[0]),
+        )
+        return indicator @ counts
+
+    @staticmethod
+    def _normalize(counts):
+        """Normalize the rows of the counts matrix to unit length."""
+        norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return diags(1 / norms) @ counts
+
+    def score(self, document, references):
+        """Score the similarity of the HTML document against the references.
+
+        Parameters
+        ----------
+        document : str
+            The HTML content of the document.
+        references : list of str
+            The HTML contents of the reference documents.
+
+        Returns
+        -------
+        scores : dict
+            The ``'document'`` key holds an array of shape ``(n_references,)``
+            with the similarity of the whole documents. The ``'sections'`` key
+            holds an array of shape ``(n_sections, n_references)`` with the
+            similarity of each section of the document to its most similar
+            section of each reference.
+        """
+
+        # Extract sections
+        sections = extract_sections(document)
+        references_sections = [extract_sections(reference) for reference in references]
+        offsets = np.cumsum(
+            [0]
+            + [len(reference_sections) for reference_sections in references_sections]
+        )
+
+        # Vectorize sections with a common vocabulary
+        self.vocabulary_ = {}
+        counts = self._vectorize(sections)
+        references_counts = self._vectorize(
+            [
+                section
+                for reference_sections in references_sections
+                for section in reference_sections
+            ]
+        )
+        counts.resize(counts.shape[0], len(self.vocabulary_))
+
+        # Documents similarity
+        document_counts = csr_matrix(counts.sum(axis=0))
+        documents_similarity = (
+            self._normalize(document_counts)
+            @ self._normalize(self._group(references_counts, offsets)).T
+        ).toarray()[0]
+
+        # Sections similarity
+        sections_similarity = np.zeros((len(sections), len(references)))
+        non_empty = np.flatnonzero(np.diff(offsets))
+        if sections and non_empty.size:
+            similarity = (
+                self._normalize(counts) @ self._normalize(references_counts).T
+            ).toarray()
+            sections_similarity[:, non_empty] = np.maximum.reduceat(
+                similarity, offsets[non_empty], axis=1
+            )
+
+        return {'document': documents_similarity, 'sections': sections_similarity}
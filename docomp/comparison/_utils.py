@@ -0,0 +1,29 @@
+"""
+Includes utilities functions and classes.
+"""
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+from re import compile
+
+ELEMENT_PATTERN = compile(r'<p>(<b>)?(.*?)(?:</b>)?</p>')
+TOKEN_PATTERN = compile(r'\w+')
+
+
+def extract_sections(html):
+    """Extract the sections of the HTML content as lists of lines.
+
+    A section starts at each bold element and includes the following
+    regular elements.
+    """
+    sections = []
+    for bold, line in ELEMENT_PATTERN.findall(html):
+        if bold or not sections:
+            sections.append([])
+        sections[-1].append(line)
+    return sections
+
+
+def tokenize(text):
+    """Split the text to lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
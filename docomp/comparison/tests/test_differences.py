@@ -1,3 +1,88 @@
 """
 Test the _differences module.
 """
+
+import random
+
+import pytest
+
+from docomp.comparison import SectionDifferences, find_differences
+from docomp.comparison._differences import diff
+
+DOCUMENT = (
+    '<p><b>1. NAME OF THE MEDICINAL PRODUCT</b></p><p>Evista 60 mg tablets</p>'
+    '<p><b>2. STATEMENT OF ACTIVE SUBSTANCE</b></p><p>Raloxifene hydrochloride</p>'
+    '<p><b>3. LIST OF EXCIPIENTS</b></p><p>Lactose</p>'
+)
+REFERENCE = (
+    '<p><b>1. NAME OF THE MEDICINAL PRODUCT</b></p>'
+    '<p>Evista 60 mg film coated tablets</p>'
+    '<p><b>2. STATEMENT OF ACTIVE SUBSTANCE</b></p><p>Raloxifene</p>'
+    '<p><b>4. PHARMACEUTICAL FORM</b></p><p>Tablets</p>'
+)
+
+
+def lcs_length(a, b):
+    """Calculate the length of the longest common subsequence."""
+    lengths = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i, a_item in enumerate(a):
+        for j, b_item in enumerate(b):
+            lengths[i + 1][j + 1] = (
+                lengths[i][j] + 1
+                if a_item == b_item
+                else max(lengths[i][j + 1], lengths[i + 1][j])
+            )
+    return lengths[-1][-1]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_diff(seed):
+    """Test that the differences transform the sequences with minimal edits."""
+    random_state = random.Random(seed)
+    for _ in range(200):
+        a = random_state.choices('abc', k=random_state.randint(0, 12))
+        b = random_state.choices('abc', k=random_state.randint(0, 12))
+        opcodes = diff(a, b)
+        transformed, index = [], 0
+        for tag, start, end, b_start, b_end in opcodes:
+            assert (
+                tag
+                == {
+                    (True, False): 'insert',
+                    (False, True): 'delete',
+                    (False, False): 'replace',
+                }[(start == end, b_start == b_end)]
+            )
+            transformed += a[index:start] + b[b_start:b_end]
+            index = end
+        assert transformed + a[index:] == b
+        assert len(a) - sum(end - start for _, start, end, *_ in opcodes) == (
+            lcs_length(a, b)
+        )
+
+
+def test_find_differences():
+    """Test the differences of aligned sections."""
+    differences = find_differences(DOCUMENT, REFERENCE)
+    assert all(isinstance(section, SectionDifferences) for section in differences)
+    assert [section.title for section in differences] == [
+        '1. NAME OF THE MEDICINAL PRODUCT',
+        '2. STATEMENT OF ACTIVE SUBSTANCE',
+        '3. LIST OF EXCIPIENTS',
+        '4. PHARMACEUTICAL FORM',
+    ]
+    name, substance, excipients, form = differences
+    assert name.opcodes == [('insert', 9, 9, 9, 11)]
+    assert name.reference_tokens[9:11] == ['film', 'coated']
+    assert substance.opcodes == [('delete', 6, 7, 6, 6)]
+    assert substance.tokens[6] == 'hydrochloride'
+    assert excipients.reference_tokens == []
+    assert excipients.opcodes == [('delete', 0, 5, 0, 0)]
+    assert form.tokens == []
+    assert form.opcodes == [('insert', 0, 0, 0, 4)]
+
+
+def test_find_differences_identical():
+    """Test that identical documents have no differences."""
+    assert find_differences(DOCUMENT, DOCUMENT) == []
+    assert find_differences('', '') == []
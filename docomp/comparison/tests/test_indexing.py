@@ -0,0 +1,73 @@
+"""
+Test the _indexing module.
+"""
+
+import pytest
+
+from docomp.comparison import SectionsIndex
+
+SECTIONS = {
+    'evista': 'Evista 60 mg film coated tablets raloxifene hydrochloride oral use',
+    'optruma': 'Optruma 60 mg film coated tablets raloxifene hydrochloride oral use',
+    'azarga': 'Azarga 10 mg/ml + 5 mg/ml eye drops suspension brinzolamide timolol',
+}
+DOCUMENT = (
+    '<p><b>1. NAME OF THE MEDICINAL PRODUCT</b></p><p>Evista 60 mg tablets</p>'
+    '<p><b>2. STATEMENT OF ACTIVE SUBSTANCE</b></p><p>Raloxifene hydrochloride</p>'
+)
+
+
+def test_sections_index_wrong_bands():
+    """Test that the bands should divide the permutations."""
+    with pytest.raises(ValueError, match='Parameter `n_bands` should divide'):
+        SectionsIndex(n_permutations=128, n_bands=5)
+
+
+def test_sections_index_query():
+    """Test the query of similar sections."""
+    index = SectionsIndex()
+    for key, text in SECTIONS.items():
+        index.add(key, text)
+    assert len(index) == 3
+    neighbors = index.query(SECTIONS['evista'])
+    assert neighbors[0] == ('evista', 1.0)
+    assert neighbors[1][0] == 'optruma'
+    assert 'azarga' not in dict(neighbors)
+    assert index.query('unrelated text about something else') == []
+    assert len(index.query(SECTIONS['evista'], n_neighbors=1)) == 1
+
+
+def test_sections_index_incremental():
+    """Test the replacement and removal of sections."""
+    index = SectionsIndex()
+    index.add('evista', SECTIONS['evista']).add('evista', SECTIONS['azarga'])
+    assert len(index) == 1
+    assert index.query(SECTIONS['azarga'])[0] == ('evista', 1.0)
+    assert index.query(SECTIONS['evista']) == []
+    index.remove('evista')
+    assert 'evista' not in index
+    assert all(not buckets for buckets in index.buckets_)
+
+
+def test_sections_index_add_html():
+    """Test the indexing of the sections of HTML content."""
+    index = SectionsIndex().add_html(('Evista', 'en', 'labelling'), DOCUMENT)
+    assert ('Evista', 'en', 'labelling', 0) in index
+    assert ('Evista', 'en', 'labelling', 1) in index
+    neighbors = index.query('2. STATEMENT OF ACTIVE SUBSTANCE Raloxifene hydrochloride')
+    assert neighbors[0] == (('Evista', 'en', 'labelling', 1), 1.0)
+
+
+def test_sections_index_save_load(tmp_path):
+    """Test the serialization of the index."""
+    index = SectionsIndex(n_permutations=64, n_bands=16, ngram_size=3)
+    for key, text in SECTIONS.items():
+        index.add(key, text)
+    index.save(tmp_path / 'index.pkl')
+    loaded_index = SectionsIndex.load(tmp_path / 'index.pkl')
+    assert loaded_index.n_permutations == 64
+    assert loaded_index.ngram_size == 3
+    for text in SECTIONS.values():
+        assert loaded_index.query(text) == index.query(text)
+    loaded_index.add('optruma', SECTIONS['azarga'])
+    assert loaded_index.query(SECTIONS['azarga'])[0][1] == 1.0
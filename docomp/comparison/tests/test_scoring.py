@@ -1,3 +1,53 @@
 """
 Test the _scoring module.
 """
+
+import numpy as np
+import pytest
+
+from docomp.comparison import SimilarityScorer
+from docomp.comparison._utils import extract_sections
+
+DOCUMENT = (
+    '<p><b>1. NAME OF THE MEDICINAL PRODUCT</b></p><p>Evista 60 mg tablets</p>'
+    '<p><b>2. STATEMENT OF ACTIVE SUBSTANCE</b></p><p>Raloxifene hydrochloride</p>'
+)
+SIMILAR_DOCUMENT = (
+    '<p><b>1. NAME OF THE MEDICINAL PRODUCT</b></p>'
+    '<p>Evista 60 mg film coated tablets</p>'
+    '<p><b>2. STATEMENT OF ACTIVE SUBSTANCE</b></p><p>Raloxifene</p>'
+)
+DIFFERENT_DOCUMENT = '<p><b>PACKAGE LEAFLET</b></p><p>Azarga eye drops</p>'
+
+
+@pytest.mark.parametrize('ngram_range', [(1, 1), (1, 2), (2, 3)])
+def test_similarity_scorer(ngram_range):
+    """Test the similarity scores of a document against many references."""
+    references = [DOCUMENT, SIMILAR_DOCUMENT, DIFFERENT_DOCUMENT, '']
+    scores = SimilarityScorer(ngram_range).score(DOCUMENT, references)
+    assert scores['document'].shape == (4,)
+    assert scores['sections'].shape == (2, 4)
+    np.testing.assert_allclose(scores['document'][[0, 3]], [1.0, 0.0])
+    np.testing.assert_allclose(scores['sections'][:, [0, 3]], [[1.0, 0.0], [1.0, 0.0]])
+    assert 1.0 > scores['document'][1] > scores['document'][2]
+    assert (scores['sections'][:, 1] > scores['sections'][:, 2]).all()
+
+
+def test_similarity_scorer_sections_against_references():
+    """Test that sections are scored against their most similar section."""
+    reversed_document = ''.join(
+        f'<p><b>{title}</b></p>' + ''.join(f'<p>{line}</p>' for line in lines)
+        for title, *lines in extract_sections(DOCUMENT)[::-1]
+    )
+    scores = SimilarityScorer().score(DOCUMENT, [reversed_document])
+    np.testing.assert_allclose(scores['sections'], [[1.0], [1.0]])
+
+
+def test_similarity_scorer_empty():
+    """Test the similarity scores of empty documents."""
+    scores = SimilarityScorer().score('', [DOCUMENT])
+    assert scores['sections'].shape == (0, 1)
+    np.testing.assert_allclose(scores['document'], [0.0])
+    scores = SimilarityScorer().score(DOCUMENT, [])
+    assert scores['document'].shape == (0,)
+    assert scores['sections'].shape == (2, 0)
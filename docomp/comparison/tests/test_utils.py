@@ -0,0 +1,31 @@
+"""
+Test the _utils module.
+"""
+
+from docomp.comparison._utils import extract_sections, tokenize
+
+DOCUMENT = (
+    '<p><b>1. NAME OF THE MEDICINAL PRODUCT</b></p><p>Evista 60 mg tablets</p>'
+    '<p><b>2. STATEMENT OF ACTIVE SUBSTANCE</b></p><p>Raloxifene hydrochloride</p>'
+)
+
+
+def test_extract_sections():
+    """Test the extraction of sections from HTML content."""
+    assert extract_sections(DOCUMENT) == [
+        ['1. NAME OF THE MEDICINAL PRODUCT', 'Evista 60 mg tablets'],
+        ['2. STATEMENT OF ACTIVE SUBSTANCE', 'Raloxifene hydrochloride'],
+    ]
+    assert extract_sections('<p>Text</p><p><b>Title</b></p>') == [['Text'], ['Title']]
+    assert extract_sections('') == []
+
+
+def test_tokenize():
+    """Test the tokenization of text."""
+    assert tokenize('Evista 60 mg, film-coated') == [
+        'evista',
+        '60',
+        'mg',
+        'film',
+        'coated',
+    ]
@@ -3,6 +3,32 @@ The :mod:`docomp.content` provides the tools to download and extract leaflet
 content from the industry and EMA documents.
 """
 
-from ._epar._main import extract_epar_content
+from importlib import import_module
 
-__all__ = ['extract_epar_content']
+MODULES_MAPPING = {
+    'extract_epar_content': '._epar._main',
+    'extract_epar_contents': '._epar._main',
+    'EMAMirror': '._epar._mirror',
+    'extract_industry_content': '._industry._main',
+    'extract_industry_contents': '._industry._main',
+    'Instrumentation': '._instrumentation',
+    'CallbackInstrumentation': '._instrumentation',
+    'MetricsRecorder': '._instrumentation',
+    'instrument': '._instrumentation',
+    'ContentStore': '._store',
+}
+
+__all__ = list(MODULES_MAPPING)
+
+
+def __getattr__(name):
+    """Import the functions and their dependencies on first access."""
+    if name in MODULES_MAPPING:
+        value = getattr(import_module(MODULES_MAPPING[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,126 @@
+"""
+Includes classes and functions to cache data on disk.
+"""
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+import mmap
+import os
+import shutil
+import threading
+from hashlib import sha256
+from tempfile import NamedTemporaryFile
+
+SIZES = {}
+SIZES_LOCK = threading.Lock()
+
+
+def hash_key(*parts):
+    """Generate a cache key from the representation of its parts."""
+    return sha256(repr(parts).encode()).hexdigest()
+
+
+class FileCache:
+    """Size-bounded least recently used cache of files in a directory.
+
+    Each entry is stored as a file named after its key. The modification time
+    of a file is updated on every access and the least recently used entries
+    are evicted when the total size exceeds ``max_size`` bytes. The total size
+    is tracked incrementally per process and directory, so that the directory
+    is scanned only when the limit is exceeded instead of on every write.
+    """
+
+    def __init__(self, path, max_size=None):
+        self.path = path
+        self.max_size = max_size
+
+    def _path(self, key):
+        """Get the path of an entry."""
+        return os.path.join(self.path, key)
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Get the data of an entry or ``None`` if it does not exist."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                data = cache_file.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+
+    def mmap(self, key):
+        """Memory-map the data of an entry or get ``None`` if it does not
+        exist."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                if not os.fstat(cache_file.fileno()).st_size:
+                    return b''
+                return mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, data):
+        """Store the data of an entry and evict old entries.
+
+        The data are either bytes or a binary file that is copied from its
+        current position.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        tmp = NamedTemporaryFile(dir=self.path, suffix='.tmp', delete=False)
+        try:
+            with tmp:
+                if hasattr(data, 'read'):
+                    shutil.copyfileobj(data, tmp)
+                else:
+                    tmp.write(data)
+                size = tmp.tell()
+            path = self._path(key)
+            try:
+                size -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp.name, path)
+        finally:
+            if os.path.exists(tmp.name):
+                os.unlink(tmp.name)
+        if self.max_size is None:
+            return
+        root = os.path.abspath(self.path)
+        with SIZES_LOCK:
+            total_size = SIZES.get(root)
+            if total_size is not None:
+                total_size = SIZES[root] = total_size + size
+        if total_size is None or total_size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the size limit holds."""
+        if self.max_size is None:
+            return
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+        with SIZES_LOCK:
+            SIZES[os.path.abspath(self.path)] = total_size
@@ -4,84 +4,321 @@ Includes classes and functions to download the latest EPAR document.
 
 # Author: Georgios Douzas <gdouzas@icloud.com>
 
+import asyncio
+import json
+import os
+import pickle
+import re
+import shutil
+import zlib
+from hashlib import sha256
+from html.parser import HTMLParser
+from io import BytesIO
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
 from urllib.parse import urlparse, urljoin
-from urllib.request import urlopen, urlretrieve
+from urllib.request import Request, urlopen
 
 import pandas as pd
-from bs4 import BeautifulSoup
-from pdfminer.high_level import extract_pages
+from pdfminer.converter import PDFPageAggregator
 from pdfminer.layout import LAParams
+from pdfminer.pdfdocument import PDFDocument, PDFNoOutlines
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser, PDFSyntaxError
+from pdfminer.pdftypes import PDFObjRef, resolve1
+from pdfminer.psparser import PSLiteral
 
-from .._utils import check_param, BaseDownloader
+from .._cache import FileCache, hash_key
+from .._http import CHUNK_SIZE, AsyncHTTPClient, get_header
+from .._instrumentation import count, span
+from .._utils import check_param, single_flight, BaseDownloader, ConfigAttribute
+from ._extraction import SectionExtractor, index_page
+from ._layout import TextLinesDevice
 from ... import CONFIG
 
 CONFIG = CONFIG['content']['epar']['downloading']
+VALIDATORS = ('ETag', 'Last-Modified')
+DEVICES_MAPPING = {'layout': PDFPageAggregator, 'text_lines': TextLinesDevice}
+REPORT_TTL = CONFIG['epar_downloader']['report_ttl'].get
+
+
+@single_flight(ttl=REPORT_TTL)
+def read_report(report_url, skiprows=None, usecols=None):
+    """Read the authorised products of the report excel file.
+
+    The report is fetched and parsed once per process for each combination
+    of parameters and it is shared by all the downloaders. It is fetched again
+    after ``report_ttl`` seconds, so that long-running processes find the
+    newly authorised products.
+    """
+    report = pd.read_excel(report_url, skiprows=skiprows, usecols=usecols)
+    return report[report['Authorisation status'] == 'Authorised']
+
+
+@single_flight(ttl=REPORT_TTL)
+def index_report(report_url, skiprows=None, usecols=None):
+    """Index the report as a mapping from product name to main url."""
+    report = read_report(report_url, skiprows, usecols).dropna(subset=['Medicine name'])
+    report = report.drop_duplicates('Medicine name')
+    return dict(zip(report['Medicine name'], report['URL']))
+
+
+class AnchorsParser(HTMLParser):
+    """Streaming parser of the links of the anchors with a path prefix.
+
+    The links are collected by language while the html is fed, without
+    building the document tree.
+    """
+
+    def __init__(self, path_prefix):
+        super(AnchorsParser, self).__init__(convert_charrefs=False)
+        self.path_prefix = path_prefix
+        self.urls_ = {}
+
+    def handle_starttag(self, tag, attrs):
+        if tag != 'a':
+            return
+        for name, value in attrs:
+            if name == 'href' and value is not None:
+                url = urlparse(value)
+                if url.path.startswith(self.path_prefix):
+                    language = url.path.split('/')[-1].split('_')[-1]
+                    self.urls_[language.replace('.pdf', '')] = url.geturl()
+
+
+def extract_download_urls(html, path_prefix):
+    """Extract the mapping from language to download url of the EPAR pdf from
+    the html of a product page."""
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    parser = AnchorsParser(path_prefix)
+    parser.feed(html)
+    parser.close()
+    return parser.urls_
+
+
+@single_flight(ttl=REPORT_TTL)
+def scrape_download_urls(main_url, path_prefix):
+    """Scrape the download urls of the EPAR pdf of all the languages.
+
+    The product page is fetched and parsed once per process and every
+    ``report_ttl`` seconds, so that it is shared by the downloaders of all the
+    languages of a product.
+    """
+    with span('product_page'):
+        html = urlopen(main_url).read()
+    count('bytes.product_page', len(html))
+    with span('scrape'):
+        return extract_download_urls(html, path_prefix)
+
+
+def resolve_mirrored_url(mirror_path, url):
+    """Resolve a url to the uri of its file in a local mirror.
+
+    The files of a mirror are named after the hash of their url.
+    """
+    path = os.path.join(mirror_path, hash_key(url))
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'The url {url} is not mirrored in {mirror_path}.')
+    return Path(path).resolve().as_uri()
+
+
+def spool_response(response, max_memory_size=None, spool_path=None):
+    """Stream the content of a response to a seekable file.
+
+    The content is kept in memory up to ``max_memory_size`` bytes and it is
+    spilled to an anonymous temporary file in ``spool_path`` above it, which is
+    removed when the file is closed. Responses that announce a larger content
+    length are spilled from the start.
+    """
+    pdf_file = SpooledTemporaryFile(
+        max_size=max_memory_size or 0, dir=spool_path, prefix='docomp-'
+    )
+    try:
+        if max_memory_size is not None and (
+            max_memory_size == 0
+            or int(response.headers.get('Content-Length') or 0) > max_memory_size
+        ):
+            pdf_file.rollover()
+        shutil.copyfileobj(response, pdf_file, CHUNK_SIZE)
+        pdf_file.seek(0)
+    except BaseException:
+        pdf_file.close()
+        raise
+    return pdf_file
+
+
+def hash_file(pdf_file):
+    """Get the content hash and the size of a seekable file and rewind it."""
+    content_hash = sha256()
+    pdf_file.seek(0)
+    for chunk in iter(lambda: pdf_file.read(CHUNK_SIZE), b''):
+        content_hash.update(chunk)
+    size = pdf_file.tell()
+    pdf_file.seek(0)
+    return content_hash.hexdigest(), size
+
+
+def _resolve_outline_page_number(document, pages_numbers, dest, action):
+    """Resolve the zero-indexed page number of an outline item."""
+    if dest is None and action is not None:
+        dest = resolve1(action).get('D')
+    dest = resolve1(dest)
+    if isinstance(dest, (bytes, str, PSLiteral)):
+        dest = resolve1(
+            document.get_dest(dest.name if isinstance(dest, PSLiteral) else dest)
+        )
+    if isinstance(dest, dict):
+        dest = resolve1(dest.get('D'))
+    if isinstance(dest, list) and dest and isinstance(dest[0], PDFObjRef):
+        return pages_numbers.get(dest[0].objid)
+
+
+def locate_sections(pdf_file, titles_patterns):
+    """Locate the zero-indexed page numbers of the labelling and leaflet
+    sections from the outline of the pdf, without layout analysis.
+
+    The labelling title page is the destination of the last top level item of
+    the outline with a title that matches the first pattern and the leaflet
+    title page is the destination of the next one that matches the second
+    pattern. The page numbers of the title pages and of the sections are
+    returned, or ``None`` when they can not be located.
+    """
+    labelling_pattern, leaflet_pattern = [
+        re.compile(pattern) for pattern in titles_patterns
+    ]
+    try:
+        document = PDFDocument(PDFParser(pdf_file))
+        pages_numbers = {
+            page.pageid: page_number
+            for page_number, page in enumerate(PDFPage.create_pages(document))
+        }
+        titles_page_numbers = []
+        for level, title, dest, action, _ in document.get_outlines():
+            if level != 1 or not isinstance(title, str):
+                continue
+            if labelling_pattern.match(title.strip()):
+                titles_page_numbers = [
+                    _resolve_outline_page_number(document, pages_numbers, dest, action)
+                ]
+            elif len(titles_page_numbers) == 1 and leaflet_pattern.match(title.strip()):
+                titles_page_numbers.append(
+                    _resolve_outline_page_number(document, pages_numbers, dest, action)
+                )
+    except (PDFNoOutlines, PDFSyntaxError, KeyError):
+        return None
+    finally:
+        pdf_file.seek(0)
+    if len(titles_page_numbers) != 2 or None in titles_page_numbers:
+        return None
+    first_page_number, second_page_number = titles_page_numbers
+    if first_page_number >= second_page_number:
+        return None
+    return titles_page_numbers, list(range(first_page_number, len(pages_numbers)))
+
+
+def hash_page(page):
+    """Hash the content streams, the fonts and the external objects of a pdf
+    page, without layout analysis."""
+    page_hash = sha256(repr((page.mediabox, page.rotate)).encode())
+    for stream in page.contents:
+        page_hash.update(resolve1(stream).get_data())
+    resources = resolve1(page.resources) or {}
+    fonts = resolve1(resources.get('Font')) or {}
+    for name in sorted(fonts):
+        page_hash.update(repr((name, resolve1(fonts[name]).get('BaseFont'))).encode())
+    xobjects = resolve1(resources.get('XObject')) or {}
+    for name in sorted(xobjects):
+        page_hash.update(name.encode())
+        page_hash.update(resolve1(xobjects[name]).get_rawdata() or b'')
+    return page_hash.hexdigest()
+
+
+def compact_page(page):
+    """Compact the page to the index of its text parts and images, so that
+    its layout objects can be released."""
+    return index_page(page)
 
 
 class EPARDownloader(BaseDownloader):
     """Class to download EPAR pdf document."""
 
     EPAR_CONFIG = CONFIG['epar_downloader']
-    REPORT_URL_ = urljoin(
-        CONFIG['base_url'].get(str), EPAR_CONFIG['report_url'].get(str)
+    REPORT_URL_ = ConfigAttribute(
+        lambda: urljoin(
+            CONFIG['base_url'].get(str),
+            CONFIG['epar_downloader']['report_url'].get(str),
+        )
     )
-    PRODUCT_URL_ = EPAR_CONFIG['product_url'].get(str)
-    SKIPROWS_ = EPAR_CONFIG['skiprows'].get(int)
-    USECOLS_ = EPAR_CONFIG['usecols'].get(str)
-    BOXES_FLOW_ = EPAR_CONFIG['boxes_flow'].get()
-    CHAR_MARGIN_ = EPAR_CONFIG['char_margin'].get(float)
+    PRODUCT_URL_ = ConfigAttribute(EPAR_CONFIG['product_url'].get, str)
+    SKIPROWS_ = ConfigAttribute(EPAR_CONFIG['skiprows'].get, int)
+    USECOLS_ = ConfigAttribute(EPAR_CONFIG['usecols'].get, str)
+    BOXES_FLOW_ = ConfigAttribute(EPAR_CONFIG['boxes_flow'].get)
+    CHAR_MARGIN_ = ConfigAttribute(EPAR_CONFIG['char_margin'].get, float)
+    LOCATE_SECTIONS_ = ConfigAttribute(EPAR_CONFIG['locate_sections'].get, bool)
+    SECTIONS_TITLES_ = ConfigAttribute(EPAR_CONFIG['sections_titles'].get, list)
+    DEVICE_ = ConfigAttribute(EPAR_CONFIG['device'].get, str)
+    CACHE_PATH_ = ConfigAttribute(EPAR_CONFIG['cache_path'].get)
+    CACHE_MAX_SIZE_ = ConfigAttribute(EPAR_CONFIG['cache_max_size'].get)
+    MIRROR_PATH_ = ConfigAttribute(EPAR_CONFIG['mirror_path'].get)
+    MAX_MEMORY_SIZE_ = ConfigAttribute(EPAR_CONFIG['max_memory_size'].get)
+    SPOOL_PATH_ = ConfigAttribute(EPAR_CONFIG['spool_path'].get)
 
     def __init__(self, product, language='en'):
         self.product = product
         self.language = language
 
+    def _resolve_url(self, url):
+        """Resolve a url against the local mirror in offline mode."""
+        if self.MIRROR_PATH_ is None:
+            return url
+        return resolve_mirrored_url(self.MIRROR_PATH_, url)
+
     @property
     def report_(self):
         """Get the report excel file."""
-        report = pd.read_excel(
-            self.REPORT_URL_, skiprows=self.SKIPROWS_, usecols=self.USECOLS_
-        )
-        return report[report['Authorisation status'] == 'Authorised']
+        report_url = self._resolve_url(self.REPORT_URL_)
+        with span('report'):
+            return read_report(report_url, self.SKIPROWS_, self.USECOLS_)
+
+    @property
+    def products_urls_(self):
+        """Get the mapping from product name to main url."""
+        report_url = self._resolve_url(self.REPORT_URL_)
+        with span('report'):
+            return index_report(report_url, self.SKIPROWS_, self.USECOLS_)
 
     @property
     def available_products_(self):
         """Get the available products."""
-        return self.report_['Medicine name'].unique()
+        return self.products_urls_.keys()
 
     @property
     def main_url_(self):
         """Get the EPAR document main url for a specific product."""
 
         # Check product
-        self.product_ = check_param(
-            'product', self.product.capitalize(), self.available_products_
-        )
-
-        # Extract product url
-        main_url = self.report_.loc[
-            self.report_['Medicine name'] == self.product_, 'URL'
-        ].values[0]
+        products_urls = self.products_urls_
+        self.product_ = check_param('product', self.product.capitalize(), products_urls)
 
-        return main_url
+        return products_urls[self.product_]
 
     @property
-    def download_url_(self):
-        """Get the EPAR's document download url for a specific product and
-        language."""
+    def path_prefix_(self):
+        """Get the path prefix of the EPAR document download urls for a
+        specific product."""
+        return self.PRODUCT_URL_.format(self.product_.lower())
 
-        # Get EPAR document html
-        html = urlopen(self.main_url_)
-        bsObj = BeautifulSoup(html.read(), features='html.parser')
+    @property
+    def download_urls_(self):
+        """Get the mapping from language to EPAR's document download url for a
+        specific product."""
+        main_url = self._resolve_url(self.main_url_)
+        return dict(scrape_download_urls(main_url, self.path_prefix_))
 
-        # Get available urls
-        urls = {}
-        for el in bsObj.find_all('a'):
-            url = urlparse(el.get('href'))
-            url_start = self.PRODUCT_URL_.format(self.product_.lower())
-            if str(url.path).startswith(url_start):
-                urls[
-                    url.path.split('/')[-1].split('_')[-1].replace('.pdf', '')
-                ] = url.geturl()
+    def _select_download_url(self, urls):
+        """Select the EPAR's document download url of the language."""
 
         # Check language
         self.available_languages_ = urls.keys()
@@ -91,15 +328,357 @@ class EPARDownloader(BaseDownloader):
 
         return urls[self.language_]
 
-    def download(self):
-        """Download EPAR pdf."""
-        path = urlretrieve(self.download_url_)[0]
-        pages = list(
-            extract_pages(
-                path,
-                laparams=LAParams(
-                    boxes_flow=self.BOXES_FLOW_, char_margin=self.CHAR_MARGIN_
-                ),
+    @property
+    def download_url_(self):
+        """Get the EPAR's document download url for a specific product and
+        language."""
+        return self._select_download_url(self.download_urls_)
+
+    @property
+    def cache_(self):
+        """Get the cache of the downloaded and parsed documents."""
+        if self.CACHE_PATH_ is None:
+            return None
+        return FileCache(self.CACHE_PATH_, self.CACHE_MAX_SIZE_)
+
+    @property
+    def fingerprint_key_(self):
+        """Get the cache key of the EPAR pdf fingerprint."""
+        return hash_key('fingerprint', self.product.lower(), self.language.lower())
+
+    @property
+    def fingerprint_(self):
+        """Get the recorded fingerprint of the EPAR pdf or ``None``."""
+        cache = self.cache_
+        fingerprint = None if cache is None else cache.get(self.fingerprint_key_)
+        return None if fingerprint is None else json.loads(fingerprint)
+
+    def _record(self, download_url, pdf_file, headers):
+        """Store the retrieved EPAR pdf and record its fingerprint."""
+        cache = self.cache_
+        if cache is None:
+            return
+        content_hash, size = hash_file(pdf_file)
+        cache.set(content_hash, pdf_file)
+        pdf_file.seek(0)
+        fingerprint = {'url': download_url, 'size': size, 'hash': content_hash}
+        fingerprint.update({name: headers.get(name) for name in VALIDATORS})
+        cache.set(self.fingerprint_key_, json.dumps(fingerprint).encode())
+
+    def _load_unchanged(self, download_url):
+        """Load the stored EPAR pdf when its fingerprint is unchanged.
+
+        The url, the size and the validators of the fingerprint are compared
+        with the headers of a HEAD request, so that unchanged pdfs are not
+        downloaded again. ``None`` is returned for changed pdfs.
+        """
+        self.unchanged_ = False
+        fingerprint = self.fingerprint_
+        if fingerprint is None or fingerprint['url'] != download_url:
+            return None
+        try:
+            head_url = self._resolve_url(download_url)
+            with span('head', product=self.product):
+                with urlopen(Request(head_url, method='HEAD')) as response:
+                    headers = response.headers
+        except (OSError, ValueError):
+            return None
+        if headers.get('Content-Length') != str(fingerprint['size']):
+            count('cache.pdf.miss', product=self.product)
+            return None
+        for name in VALIDATORS:
+            if fingerprint[name] is not None and headers.get(name) != fingerprint[name]:
+                count('cache.pdf.miss', product=self.product)
+                return None
+        data = self.cache_.get(fingerprint['hash'])
+        self.unchanged_ = data is not None
+        count(f'cache.pdf.{"hit" if self.unchanged_ else "miss"}', product=self.product)
+        return data
+
+    def _parse_page(self, interpreter, device, cache, page_number, pdf_page):
+        """Load or analyze and compact a page of the EPAR pdf and get its
+        content hash, which is ``None`` when the cache is disabled."""
+
+        # Load cached page
+        page = page_hash = None
+        if cache is not None:
+            page_hash = hash_page(pdf_page)
+            page_key = hash_key(
+                page_hash, self.BOXES_FLOW_, self.CHAR_MARGIN_, self.DEVICE_
             )
+            cached_page = cache.get(page_key)
+            if cached_page is not None:
+                page = pickle.loads(zlib.decompress(cached_page))
+            count(f'cache.page.{"miss" if page is None else "hit"}')
+
+        # Analyze and cache page
+        if page is None:
+            with span('layout', pageid=page_number + 1):
+                interpreter.process_page(pdf_page)
+                page = compact_page(device.get_result())
+            count('pages.parsed')
+            if cache is not None:
+                cache.set(
+                    page_key,
+                    zlib.compress(pickle.dumps(page, protocol=pickle.HIGHEST_PROTOCOL)),
+                )
+
+        page.pageid = page_number + 1
+        return page_hash, page
+
+    def _iter_parse(self, pdf_file):
+        """Parse and compact the pages of the EPAR pdf one at a time.
+
+        When the sections are located, layout analysis runs only on the pages
+        of the labelling and leaflet sections. The located title pages are
+        analyzed first and all the pages are parsed when they are not
+        identified as title pages, so that a misleading outline does not lose
+        the sections. Each page is compacted as soon as it is analyzed, so
+        that its layout objects are released. When the cache is enabled, the
+        compacted pages are stored per page content hash and reused for the
+        unchanged pages of new versions of the pdf. The ``text_lines`` device
+        yields page indexes directly, without the layout objects of the
+        ``layout`` device.
+        """
+        device_class = DEVICES_MAPPING[
+            check_param('device', self.DEVICE_, DEVICES_MAPPING)
+        ]
+        located_sections = (
+            locate_sections(pdf_file, self.SECTIONS_TITLES_)
+            if self.LOCATE_SECTIONS_
+            else None
+        )
+        resource_manager = PDFResourceManager(caching=True)
+        device = device_class(
+            resource_manager,
+            laparams=LAParams(
+                boxes_flow=self.BOXES_FLOW_, char_margin=self.CHAR_MARGIN_
+            ),
+        )
+        interpreter = PDFPageInterpreter(resource_manager, device)
+        cache = self.cache_
+        self.pages_hashes_ = []
+
+        # Check the located title pages
+        page_numbers, parsed_pages = None, {}
+        if located_sections is not None:
+            titles_page_numbers, page_numbers = located_sections
+            for page_number, pdf_page in zip(
+                titles_page_numbers, PDFPage.get_pages(pdf_file, titles_page_numbers)
+            ):
+                parsed_pages[page_number] = self._parse_page(
+                    interpreter, device, cache, page_number, pdf_page
+                )
+            section_extractor = SectionExtractor()
+            if not all(
+                section_extractor._is_title_page(page)
+                for _, page in parsed_pages.values()
+            ):
+                page_numbers = None
+
+        pdf_pages = PDFPage.get_pages(pdf_file, page_numbers)
+        for page_number, pdf_page in (
+            enumerate(pdf_pages)
+            if page_numbers is None
+            else zip(page_numbers, pdf_pages)
+        ):
+            page_hash, page = parsed_pages.pop(page_number, None) or self._parse_page(
+                interpreter, device, cache, page_number, pdf_page
+            )
+            if page_hash is not None:
+                self.pages_hashes_.append(page_hash)
+            yield page
+
+    def open_pdf(self):
+        """Retrieve the download url and a seekable file of the EPAR pdf.
+
+        The response is streamed to a buffer that is kept in memory up to
+        ``MAX_MEMORY_SIZE_`` bytes and spilled to an anonymous temporary file
+        in ``SPOOL_PATH_`` above it, so that nothing is left on disk once the
+        file is closed by the caller. When the cache is enabled, the pdf is
+        downloaded only if its fingerprint has changed. In offline mode the
+        urls are resolved against the local mirror of ``MIRROR_PATH_``.
+        """
+        download_url = self.download_url_
+        data = self._load_unchanged(download_url)
+        if data is not None:
+            return download_url, BytesIO(data)
+        with span('download', product=self.product):
+            with urlopen(self._resolve_url(download_url)) as response:
+                pdf_file = spool_response(
+                    response, self.MAX_MEMORY_SIZE_, self.SPOOL_PATH_
+                )
+                headers = response.headers
+        try:
+            count('bytes.download', pdf_file.seek(0, os.SEEK_END), product=self.product)
+            pdf_file.seek(0)
+            self._record(download_url, pdf_file, headers)
+        except BaseException:
+            pdf_file.close()
+            raise
+        return download_url, pdf_file
+
+    def retrieve(self):
+        """Retrieve the download url and the content of the EPAR pdf."""
+        download_url, pdf_file = self.open_pdf()
+        with pdf_file:
+            return download_url, pdf_file.read()
+
+    def iter_pages(self, download_url, data):
+        """Parse the retrieved EPAR pdf and yield its compacted pages one at a
+        time.
+
+        The pdf is given either as its content or as a seekable file.
+        """
+        pdf_file = BytesIO(data) if isinstance(data, bytes) else data
+
+        # Parse without caching
+        cache = self.cache_
+        if cache is None:
+            yield from self._iter_parse(pdf_file)
+            return
+
+        # Store the content-addressed pdf
+        content_hash, _ = hash_file(pdf_file)
+        if content_hash not in cache:
+            cache.set(content_hash, pdf_file)
+
+        # Load or parse and store the compacted pages one at a time
+        yield from self._iter_parse(pdf_file)
+
+        # Record the pages hashes of the fingerprint
+        fingerprint = self.fingerprint_
+        if fingerprint is not None and fingerprint['hash'] == content_hash:
+            fingerprint['pages'] = self.pages_hashes_
+            cache.set(self.fingerprint_key_, json.dumps(fingerprint).encode())
+
+    def download(self):
+        """Download EPAR pdf and get its compacted pages."""
+        download_url, pdf_file = self.open_pdf()
+        with pdf_file:
+            return list(self.iter_pages(download_url, pdf_file))
+
+    def stream(self):
+        """Download EPAR pdf and yield its compacted pages one at a time.
+
+        Pages are parsed lazily so that only the pages which are currently
+        consumed are kept in memory. The pdf is retrieved on the first
+        iteration and its file is closed when the pages are exhausted or the
+        iteration is closed.
+        """
+        download_url, pdf_file = self.open_pdf()
+        with pdf_file:
+            yield from self.iter_pages(download_url, pdf_file)
+
+
+class AsyncEPARDownloader(EPARDownloader):
+    """Class to download EPAR pdf document asynchronously.
+
+    The product page and the pdf are fetched through a pooled HTTP client with
+    bounded concurrency, rate limiting per host, retries and resumable
+    downloads. The synchronous methods of ``EPARDownloader`` keep working and
+    run the asynchronous ones to completion.
+    """
+
+    ASYNC_CONFIG = CONFIG['async_epar_downloader']
+    MAX_CONNECTIONS_ = ConfigAttribute(ASYNC_CONFIG['max_connections'].get, int)
+    RATE_LIMIT_ = ConfigAttribute(ASYNC_CONFIG['rate_limit'].get)
+    MAX_RETRIES_ = ConfigAttribute(ASYNC_CONFIG['max_retries'].get, int)
+    BACKOFF_FACTOR_ = ConfigAttribute(ASYNC_CONFIG['backoff_factor'].get, float)
+    TIMEOUT_ = ConfigAttribute(ASYNC_CONFIG['timeout'].get, float)
+
+    @classmethod
+    def create_client(cls):
+        """Create the HTTP client."""
+        return AsyncHTTPClient(
+            max_connections=cls.MAX_CONNECTIONS_,
+            rate_limit=cls.RATE_LIMIT_,
+            max_retries=cls.MAX_RETRIES_,
+            backoff_factor=cls.BACKOFF_FACTOR_,
+            timeout=cls.TIMEOUT_,
         )
-        return pages
+
+    async def _ascrape_download_urls(self, client, main_url):
+        """Scrape asynchronously the download urls of all the languages."""
+        with span('product_page', product=self.product):
+            html = await client.get(main_url)
+        count('bytes.product_page', len(html), product=self.product)
+        with span('scrape', product=self.product):
+            return extract_download_urls(html, self.path_prefix_)
+
+    async def aretrieve(self, client, scrapes=None):
+        """Retrieve asynchronously the download url and the content of the
+        EPAR pdf.
+
+        The ``scrapes`` mapping from main url to scraping task is shared by
+        the downloaders of the same product, so that its page is fetched once.
+        """
+        loop = asyncio.get_running_loop()
+        if self.MIRROR_PATH_ is not None:
+            download_url, pdf_file = await loop.run_in_executor(
+                None, EPARDownloader.open_pdf, self
+            )
+            with pdf_file:
+                return download_url, pdf_file.read()
+        main_url = await loop.run_in_executor(None, getattr, self, 'main_url_')
+        scrapes = {} if scrapes is None else scrapes
+        if main_url not in scrapes:
+            scrapes[main_url] = asyncio.ensure_future(
+                self._ascrape_download_urls(client, main_url)
+            )
+        download_url = self._select_download_url(dict(await scrapes[main_url]))
+        data = await loop.run_in_executor(None, self._load_unchanged, download_url)
+        if data is None:
+            with span('download', product=self.product):
+                _, headers, data = await client.fetch(download_url)
+            count('bytes.download', len(data), product=self.product)
+            headers = {name: get_header(headers, name) for name in VALIDATORS}
+            await loop.run_in_executor(
+                None, self._record, download_url, BytesIO(data), headers
+            )
+        return download_url, data
+
+    @classmethod
+    async def aretrieve_many(cls, products_languages, client=None):
+        """Retrieve asynchronously the EPAR pdfs of many products.
+
+        The tuples ``(product, language, result, error)`` are returned in the
+        order of the products, where ``result`` is the download url and the
+        content of the pdf. The page of each product is fetched once for all
+        its languages.
+        """
+        owns_client = client is None
+        client = cls.create_client() if owns_client else client
+        scrapes = {}
+
+        async def aretrieve(product, language):
+            try:
+                result = await cls(product, language).aretrieve(client, scrapes)
+            except Exception as error:
+                return product, language, None, error
+            return product, language, result, None
+
+        try:
+            return await asyncio.gather(
+                *[
+                    aretrieve(product, language)
+                    for product, language in products_languages
+                ]
+            )
+        finally:
+            if owns_client:
+                client.close()
+
+    def open_pdf(self):
+        """Retrieve the download url and a seekable file of the EPAR pdf."""
+        download_url, data = self.retrieve()
+        return download_url, BytesIO(data)
+
+    def retrieve(self):
+        """Retrieve the download url and the content of the EPAR pdf."""
+        *_, result, error = asyncio.run(
+            self.aretrieve_many([(self.product, self.language)])
+        )[0]
+        if error is not None:
+            raise error
+        return result
@@ -4,41 +4,162 @@ Includes classes and functions to extract content from the EPAR document.
 
 # Author: Georgios Douzas <gdouzas@icloud.com>
 
-from re import match, split
+from array import array
+from re import compile
+from sys import intern
 
-import pandas as pd
-from pdfminer.layout import LTTextContainer, LTFigure
+from pdfminer.layout import LTChar, LTFigure, LTImage, LTTextContainer, LTTextLine
 
-from .._utils import BaseExtractor
+from .._images import ImageStore, encode_stream
+from .._instrumentation import count, span
+from .._utils import BaseExtractor, ConfigAttribute
 from ... import CONFIG
 
+IMAGES_CONFIG = CONFIG['content']['epar']['extraction']['images_extractor']
 CONFIG = CONFIG['content']['epar']['extraction']['labelling_extractor']
-TYPES_MAPPING = {'text': LTTextContainer, 'image': LTFigure}
+BOLD_FONT_PATTERN = compile(r'(?i)bold|black|heavy')
+ITALIC_FONT_PATTERN = compile(r'(?i)italic|oblique')
+BOLD, ITALIC = 1, 2
+PAGE_NUMBER_PATTERN = compile(r'\d+ \|')
+ENUMERATED_TITLE_PATTERN = compile(r'\d+\. ')
+ENUMERATION_PATTERN = compile(r'\d+\.*')
+SECTION_SEPARATOR = '\n \n \n'
+
+
+def fontnames_flags(fontnames):
+    """Get the ``BOLD`` and ``ITALIC`` flags that are common to all the font
+    names of the alphanumeric characters of a text."""
+    if not fontnames:
+        return 0
+    flags = BOLD if all(map(BOLD_FONT_PATTERN.search, fontnames)) else 0
+    if all(map(ITALIC_FONT_PATTERN.search, fontnames)):
+        flags |= ITALIC
+    return flags
+
+
+def font_flags(part):
+    """Get the ``BOLD`` and ``ITALIC`` flags that are common to all the
+    alphanumeric characters of a text part."""
+    return fontnames_flags(
+        [
+            char.fontname
+            for char in part
+            if isinstance(char, LTChar) and char.get_text().isalnum()
+        ]
+    )
+
+
+class PageIndex:
+    """Compact representation of the text parts and the images of a page.
+
+    The page is traversed once. The text parts are stored as columns of
+    interned texts, flattened bounding boxes and font flags, while the images
+    are stored as their encoded payloads and filters. Therefore the pdfminer
+    layout of the page can be released as soon as it is indexed. The empty
+    lines, which pdfminer places on the page outside of the text boxes, are
+    dropped like in the text lines device.
+    """
+
+    __slots__ = ('pageid', 'text', 'bboxes', 'flags', 'image')
+
+    def __init__(self, page):
+        self.pageid = page.pageid
+        self.text, self.bboxes, self.flags, self.image = [], array('f'), array('B'), []
+        for element in page:
+            if isinstance(element, LTTextLine):
+                continue
+            if isinstance(element, LTTextContainer):
+                for part in element:
+                    self.text.append(intern(part.get_text()))
+                    self.bboxes.extend(part.bbox)
+                    self.flags.append(font_flags(part))
+            elif isinstance(element, LTFigure):
+                for part in element:
+                    if isinstance(part, LTImage):
+                        self.image.append(encode_stream(part.stream))
+
+    @classmethod
+    def from_parts(cls, pageid, parts, image):
+        """Create the index of a page from its ``(text, bbox, flags)`` text
+        parts and its ``(data, filters)`` encoded images."""
+        page = cls.__new__(cls)
+        page.pageid = pageid
+        page.text, page.bboxes, page.flags = [], array('f'), array('B')
+        for text, bbox, flags in parts:
+            page.text.append(intern(text))
+            page.bboxes.extend(bbox)
+            page.flags.append(flags)
+        page.image = list(image)
+        return page
+
+    def __getstate__(self):
+        return self.pageid, self.text, self.bboxes, self.flags, self.image
+
+    def __setstate__(self, state):
+        self.pageid, text, self.bboxes, self.flags, self.image = state
+        self.text = [intern(part) for part in text]
+
+
+def index_page(page):
+    """Index a page unless it is already indexed."""
+    return page if isinstance(page, PageIndex) else PageIndex(page)
 
 
 class EPARBaseExtractor(BaseExtractor):
-    """Base class to extract content from EPAR pdf."""
+    """Base class to extract content from EPAR pdf.
 
-    ELEMENT_TYPE_ = None
-
-    def _extract(self):
-        """Extract content."""
+    Pages are either pdfminer layouts or their indexes, which are shared by
+    all extractors. Pages can also be consumed incrementally with
+    ``partial_extract``. The extracted data then include the partially
+    extracted pages followed by the pages given at initialization.
+    """
 
-        content = []
-
-        # Iterate through pages
-        for page in self.pages:
+    ELEMENT_TYPE_ = None
 
-            # Iterate through page elements
-            for element in page:
+    def __init__(self, pages=()):
+        super(EPARBaseExtractor, self).__init__(pages)
 
-                if isinstance(element, TYPES_MAPPING[self.ELEMENT_TYPE_]):
+    def _extract_page(self, page):
+        """Extract the parts of a single page."""
+        return getattr(index_page(page), self.ELEMENT_TYPE_)
 
-                    # Iterate through parts of elements
-                    for part in element:
-                        content.append((page, element, part))
+    def _extract(self):
+        """Extract the parts of all pages."""
+        return [part for page in self.pages for part in self._extract_page(page)]
+
+    def _initialize(self):
+        """Initialize the state of incremental extraction."""
+        pass
+
+    def _update(self, parts):
+        """Update the state of incremental extraction with the parts of a
+        single page."""
+        pass
+
+    def _finalize(self):
+        """Get the extracted data from the state of incremental extraction."""
+        pass
+
+    def partial_extract(self, page):
+        """Extract the data of a single page incrementally."""
+        name = type(self).__name__
+        if not getattr(self, 'initialized_', False):
+            self._initialize()
+            self.initialized_ = True
+        with span(f'extract.{name}.page', pageid=page.pageid):
+            self._update(self._extract_page(page))
+        count(f'pages.{name}')
+        return self
 
-        return content
+    def extract(self):
+        """Extract the data."""
+        for page in self.pages:
+            self.partial_extract(page)
+        if not getattr(self, 'initialized_', False):
+            self._initialize()
+        self.initialized_ = False
+        with span(f'extract.{type(self).__name__}.finalize'):
+            return self._finalize()
 
 
 class SectionExtractor(EPARBaseExtractor):
@@ -46,42 +167,102 @@ class SectionExtractor(EPARBaseExtractor):
     document."""
 
     ELEMENT_TYPE_ = 'text'
+    SECTIONS_ = ('labelling', 'leaflet')
+
+    def _is_title_page(self, page):
+        """Check whether a page has a single line, excluding its number."""
+        page = index_page(page)
+        num_lines = 0
+        for text in self._extract_page(page):
+            line = ' '.join(text.split())
+            if line and str(page.pageid) != line:
+                num_lines += 1
+                if num_lines > 1:
+                    return False
+        return num_lines == 1
+
+    def find_sections_nums(self, pages=None):
+        """Find the page numbers of the labelling and leaflet title pages.
+
+        Pages are consumed only until both title pages are found, therefore the
+        remaining pages of a lazy iterable are never parsed.
+        """
+        self.sections_nums_ = []
+        for page in self.pages if pages is None else pages:
+            count('pages.SectionExtractor')
+            if self._is_title_page(page):
+                self.sections_nums_.append(page.pageid)
+                if len(self.sections_nums_) == len(self.SECTIONS_):
+                    break
+        return self.sections_nums_
+
+    def _check_sections_nums(self):
+        """Check that the title pages of all the sections were found."""
+        if len(self.sections_nums_) < len(self.SECTIONS_):
+            raise ValueError(
+                f'Title pages of sections {", ".join(self.SECTIONS_)} should be '
+                f'found. Got {len(self.sections_nums_)} instead.'
+            )
+
+    def iter_sections(self, pages=None):
+        """Yield the section name and the page index for each page of the
+        labelling and leaflet sections as the pages are consumed.
+
+        An error is raised after the last page when a title page is missing.
+        """
+        self.sections_nums_ = []
+        for page in self.pages if pages is None else pages:
+            page = index_page(page)
+            count('pages.SectionExtractor')
+
+            # Identify title pages
+            if len(self.sections_nums_) < len(self.SECTIONS_):
+                if self._is_title_page(page):
+                    self.sections_nums_.append(page.pageid)
+                    continue
+
+            if self.sections_nums_:
+                yield self.SECTIONS_[len(self.sections_nums_) - 1], page
+
+        self._check_sections_nums()
 
     def extract(self):
         """Extract leaflet and labelling sections."""
 
-        content = super(SectionExtractor, self)._extract()
+        with span('extract.SectionExtractor'):
 
-        # Extract pages numbers and lines
-        lines = []
-        for page, _, part in content:
-            line = ' '.join(part.get_text().split())
-            if line and str(page.pageid) != line:
-                lines.append((page.pageid, line))
+            # Index pages
+            pages = [index_page(page) for page in self.pages]
 
-        # Number of lines per page
-        pages_num_lines = pd.DataFrame(lines).groupby(0).size()
+            # Identify sections
+            self.find_sections_nums(pages)
+            self._check_sections_nums()
+            first_num, second_num = self.sections_nums_
+            pageids = [page.pageid for page in pages]
+            first_index = pageids.index(first_num)
+            second_index = pageids.index(second_num)
 
-        # Identify sections
-        first_num, second_num = self.sections_nums_ = pages_num_lines[
-            pages_num_lines == 1
-        ].index.tolist()
-
-        # Sections
-        sections = self.pages[first_num: (second_num - 1)], self.pages[second_num:]
+            # Sections
+            sections = pages[first_index + 1: second_index], pages[second_index + 1:]
 
         return sections
 
 
 class LabellingHTMLExtractor(EPARBaseExtractor):
-    """Class to extract HTML from the labelling section of EPAR."""
+    """Class to extract HTML from the labelling section of EPAR.
+
+    The text is converted to HTML elements as soon as its sections are
+    complete. The elements can be generated with ``iter_html`` or written to
+    a file-like object with ``write_html`` while the pages are consumed,
+    without keeping the text or the HTML of the whole section in memory.
+    """
 
     ELEMENT_TYPE_ = 'text'
 
     @staticmethod
-    def _extract_subsections(content):
-        """Extract subsections from initial content."""
-        sections = ''.join([part.get_text() for *_, part in content]).split('\n \n \n')
+    def _extract_subsections(text):
+        """Extract subsections from initial text."""
+        sections = text.split(SECTION_SEPARATOR)
         subsections = [section.split('\n \n') for section in sections]
         return subsections
 
@@ -92,16 +273,16 @@ class LabellingHTMLExtractor(EPARBaseExtractor):
 
         # Split on page numbers
         for subsection in subsections:
-            for line in split(r'\d+ \|', '|'.join(subsection)):
-                modified_subsections.append(line.split('|'))
+            for part in PAGE_NUMBER_PATTERN.split('|'.join(subsection)):
+                lines = part.split('|')
 
-        # Split on internal enumerated titles
-        for index, subsection in enumerate(modified_subsections):
-            for line_index, line in enumerate(subsection):
-                if match(r'\d+\. ', line) and line_index > 0:
-                    modified_subsections.remove(subsection)
-                    modified_subsections.insert(index, subsection[:line_index])
-                    modified_subsections.insert(index + 1, subsection[line_index:])
+                # Split on internal enumerated titles
+                start_index = 0
+                for line_index, line in enumerate(lines):
+                    if line_index > 0 and ENUMERATED_TITLE_PATTERN.match(line):
+                        modified_subsections.append(lines[start_index:line_index])
+                        start_index = line_index
+                modified_subsections.append(lines[start_index:])
 
         return modified_subsections
 
@@ -124,38 +305,84 @@ class LabellingHTMLExtractor(EPARBaseExtractor):
         line = " ".join(line.split())
         return f'<p><b>{line}</b></p>' if bold else f'<p>{line}</p>'
 
-    def extract(self):
-        """Extract HTML elements."""
-
-        # Extract content
-        content = super(LabellingHTMLExtractor, self)._extract()
+    def _iter_elements(self, text):
+        """Generate the HTML elements of the text of complete sections."""
 
         # Extract and modify subsections
-        subsections = self._extract_subsections(content)
+        subsections = self._extract_subsections(text)
         subsections = self._split_subsections(subsections)
         subsections = self._strip_subsections(subsections)
 
         # Extract html elements
-        html_elements = []
         for subsection in subsections:
             first_line, *other_lines = subsection
 
             # Main title
-            if not match(r'\d+\.*', first_line):
+            if not ENUMERATION_PATTERN.match(first_line):
                 for line in subsection:
-                    html_elements.append(self._extract_element(line))
+                    yield self._extract_element(line)
 
             # Enumerated title
             else:
-                html_elements.append(self._extract_element(first_line))
+                yield self._extract_element(first_line)
                 for line in other_lines:
                     line = line.replace(', \n', ', ').splitlines()
                     for splitted_line in line:
-                        html_elements.append(
-                            self._extract_element(splitted_line, False)
-                        )
+                        yield self._extract_element(splitted_line, False)
+
+    def _feed(self, text):
+        """Generate the HTML elements of the sections that the text completes.
+
+        The text of the incomplete last section is kept as a list of parts
+        until more text is fed, and it is joined only when a section separator
+        is found, so that long sections are not copied on every page.
+        """
+        tail = self.text_tail_ + text
+        self.text_parts_.append(text)
+        self.text_tail_ = tail[-(len(SECTION_SEPARATOR) - 1):]
+        if SECTION_SEPARATOR not in tail:
+            return
+        *sections, text = ''.join(self.text_parts_).split(SECTION_SEPARATOR)
+        self.text_parts_ = [text]
+        for section in sections:
+            yield from self._iter_elements(section)
+
+    def _reset_text(self):
+        """Remove the text of the incomplete last section and get it."""
+        text = ''.join(self.text_parts_)
+        self.text_parts_, self.text_tail_ = [], ''
+        return text
+
+    def _initialize(self):
+        self.text_parts_, self.text_tail_ = [], ''
+        self.html_elements_ = []
+
+    def _update(self, parts):
+        self.html_elements_.extend(self._feed(''.join(parts)))
+
+    def _finalize(self):
+        """Extract HTML elements."""
+        self.html_elements_.extend(self._iter_elements(self._reset_text()))
+        html = ''.join(self.html_elements_)
+        self.html_elements_ = []
+        return html
+
+    def iter_html(self):
+        """Generate the HTML elements of the pages as their sections are
+        recognized."""
+        name = type(self).__name__
+        self.text_parts_, self.text_tail_ = [], ''
+        for page in self.pages:
+            count(f'pages.{name}')
+            yield from self._feed(''.join(self._extract_page(page)))
+        yield from self._iter_elements(self._reset_text())
 
-        return ''.join(html_elements)
+    def write_html(self, sink):
+        """Write the HTML elements of the pages to a file-like object as their
+        sections are recognized."""
+        for html_element in self.iter_html():
+            sink.write(html_element)
+        return sink
 
 
 class LeafletHTMLExtractor(EPARBaseExtractor):
@@ -165,17 +392,35 @@ class LeafletHTMLExtractor(EPARBaseExtractor):
 
 
 class ImagesExtractor(EPARBaseExtractor):
-    """Class to extract images from pdf pages."""
+    """Class to extract images from pdf pages.
+
+    Images are added to a content-addressed store and they are extracted as
+    references that are decoded on access. A new store is created from the
+    configuration unless ``store`` is given, therefore extractors that share a
+    store, i.e. the extractors of the sections of a document, store identical
+    images once while the images are released with the store.
+    """
 
     ELEMENT_TYPE_ = 'image'
+    STORE_PATH_ = ConfigAttribute(IMAGES_CONFIG['store_path'].get)
+    MAX_MEMORY_SIZE_ = ConfigAttribute(IMAGES_CONFIG['max_memory_size'].get)
 
-    def extract(self):
+    def __init__(self, pages=(), store=None):
+        super(ImagesExtractor, self).__init__(pages)
+        self.store = store
+
+    @classmethod
+    def create_store(cls):
+        """Create an image store from the configuration."""
+        return ImageStore(cls.STORE_PATH_, cls.MAX_MEMORY_SIZE_)
 
-        content = super(ImagesExtractor, self)._extract()
+    def _initialize(self):
+        self.images_ = []
+        self.store_ = self.create_store() if self.store is None else self.store
 
-        # Iterate through pages
-        images = []
-        for *_, part in content:
-            images.append(part.stream.get_data())
+    def _update(self, parts):
+        for data, filters in parts:
+            self.images_.append(self.store_.add_encoded(data, filters))
 
-        return images
+    def _finalize(self):
+        return self.images_
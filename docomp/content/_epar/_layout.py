@@ -0,0 +1,250 @@
+"""
+Includes classes and functions to extract the text lines of pdf pages without
+the layout objects of pdfminer.
+"""
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+from pdfminer.layout import LAParams
+from pdfminer.pdfdevice import PDFTextDevice
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.utils import INF, Plane, apply_matrix_pt, uniq
+
+from .._images import encode_stream
+from ._extraction import PageIndex, fontnames_flags
+
+
+class TextLine:
+    """Text line of a page with the semantics of ``LTTextLineHorizontal``.
+
+    The characters are ``(x0, y0, x1, y1, text, fontname)`` tuples, so that
+    no layout object is created per glyph.
+    """
+
+    __slots__ = ('x0', 'y0', 'x1', 'y1', 'texts', 'fontnames', 'word_margin', '_x1')
+
+    def __init__(self, word_margin):
+        self.x0, self.y0, self.x1, self.y1 = +INF, +INF, -INF, -INF
+        self.texts, self.fontnames = [], []
+        self.word_margin = word_margin
+        self._x1 = +INF
+
+    @property
+    def width(self):
+        return self.x1 - self.x0
+
+    @property
+    def height(self):
+        return self.y1 - self.y0
+
+    def is_empty(self):
+        return self.width <= 0 or self.height <= 0
+
+    def add(self, char):
+        """Add a character and a space if it is separated from the previous
+        one."""
+        x0, y0, x1, y1, text, fontname = char
+        if self.word_margin:
+            margin = self.word_margin * max(x1 - x0, y1 - y0)
+            if self._x1 < x0 - margin:
+                self.texts.append(' ')
+        self._x1 = x1
+        self.texts.append(text)
+        if text.isalnum():
+            self.fontnames.append(fontname)
+        self.x0, self.y0 = min(self.x0, x0), min(self.y0, y0)
+        self.x1, self.y1 = max(self.x1, x1), max(self.y1, y1)
+
+    def find_neighbors(self, plane, ratio):
+        """Find the lines of the plane that are close to the line, have the
+        same height and are aligned with it."""
+        d = ratio * self.height
+        return [
+            line
+            for line in plane.find((self.x0, self.y0 - d, self.x1, self.y1 + d))
+            if abs(line.height - self.height) <= d
+            and (
+                abs(line.x0 - self.x0) <= d
+                or abs(line.x1 - self.x1) <= d
+                or abs((line.x0 + line.x1) / 2 - (self.x0 + self.x1) / 2) <= d
+            )
+        ]
+
+    def get_text(self):
+        return ''.join(self.texts) + '\n'
+
+    def get_flags(self):
+        """Get the ``BOLD`` and ``ITALIC`` flags that are common to all the
+        alphanumeric characters of the line."""
+        return fontnames_flags(self.fontnames)
+
+
+def _is_halign(char0, char1, laparams):
+    """Check whether two characters are horizontally aligned."""
+    x0, y0, x1, y1 = char0[:4]
+    other_x0, other_y0, other_x1, other_y1 = char1[:4]
+    if not (other_y0 <= y1 and y0 <= other_y1):
+        return False
+    voverlap = min(abs(y0 - other_y1), abs(y1 - other_y0))
+    if not min(y1 - y0, other_y1 - other_y0) * laparams.line_overlap < voverlap:
+        return False
+    if other_x0 <= x1 and x0 <= other_x1:
+        hdistance = 0
+    else:
+        hdistance = min(abs(x0 - other_x1), abs(x1 - other_x0))
+    return hdistance < max(x1 - x0, other_x1 - other_x0) * laparams.char_margin
+
+
+def group_chars(chars, laparams):
+    """Group the characters to text lines like ``group_objects`` of
+    ``LTLayoutContainer``."""
+    char0 = line = None
+    for char1 in chars:
+        if char0 is not None:
+            halign = _is_halign(char0, char1, laparams)
+            if halign and line is not None:
+                line.add(char1)
+            elif line is not None:
+                yield line
+                line = None
+            else:
+                line = TextLine(laparams.word_margin)
+                line.add(char0)
+                if halign:
+                    line.add(char1)
+                else:
+                    yield line
+                    line = None
+        char0 = char1
+    if line is None:
+        line = TextLine(laparams.word_margin)
+        line.add(char0)
+    yield line
+
+
+def group_lines(lines, bbox, laparams):
+    """Group the text lines to boxes like ``group_textlines`` of
+    ``LTLayoutContainer`` and sort them in reading order.
+
+    The boxes are lists of lines sorted from top to bottom.
+    """
+    plane = Plane(bbox)
+    plane.extend(lines)
+    boxes = {}
+    for line in lines:
+        members = [line]
+        for neighbor in line.find_neighbors(plane, laparams.line_margin):
+            members.append(neighbor)
+            if neighbor in boxes:
+                members.extend(boxes.pop(neighbor))
+        box = list(uniq(members))
+        for member in box:
+            boxes[member] = box
+    done, sorted_boxes = set(), []
+    for line in lines:
+        box = boxes.get(line)
+        if box is None or id(box) in done:
+            continue
+        done.add(id(box))
+        x0, y0 = min(member.x0 for member in box), min(member.y0 for member in box)
+        x1, y1 = max(member.x1 for member in box), max(member.y1 for member in box)
+        if x1 - x0 > 0 and y1 - y0 > 0:
+            sorted_boxes.append((-y0, x0, sorted(box, key=lambda member: -member.y1)))
+    sorted_boxes.sort(key=lambda box: box[:2])
+    return [box for _, _, box in sorted_boxes]
+
+
+class TextLinesDevice(PDFTextDevice):
+    """Device that extracts the text lines and the images of pdf pages as
+    page indexes.
+
+    The characters are kept as tuples and they are grouped to lines and boxes
+    like the layout analysis of pdfminer with ``boxes_flow=None``, while paths
+    and the characters of figures are ignored. Therefore the page indexes are
+    the same as the indexes of the analyzed layouts, without creating a layout
+    object per glyph. Empty lines, i.e. lines without area, are dropped.
+    """
+
+    def __init__(self, rsrcmgr, pageno=1, laparams=None):
+        super(TextLinesDevice, self).__init__(rsrcmgr)
+        self.pageno = pageno
+        self.laparams = LAParams() if laparams is None else laparams
+        if self.laparams.boxes_flow is not None:
+            raise ValueError(
+                'Parameter `boxes_flow` should be None for the text lines '
+                f'device. Got {self.laparams.boxes_flow} instead.'
+            )
+
+    def begin_page(self, page, ctm):
+        x0, y0, x1, y1 = page.mediabox
+        x0, y0 = apply_matrix_pt(ctm, (x0, y0))
+        x1, y1 = apply_matrix_pt(ctm, (x1, y1))
+        self.bbox_ = (0, 0, abs(x0 - x1), abs(y0 - y1))
+        self.chars_, self.images_, self.depth_ = [], [], 0
+
+    def end_page(self, page):
+        parts = []
+        if self.chars_:
+            lines = [
+                line
+                for line in group_chars(self.chars_, self.laparams)
+                if not line.is_empty()
+            ]
+            for box in group_lines(lines, self.bbox_, self.laparams):
+                for line in box:
+                    parts.append(
+                        (
+                            line.get_text(),
+                            (line.x0, line.y0, line.x1, line.y1),
+                            line.get_flags(),
+                        )
+                    )
+        self.result_ = PageIndex.from_parts(self.pageno, parts, self.images_)
+        self.chars_, self.images_ = [], []
+        self.pageno += 1
+
+    def begin_figure(self, name, bbox, matrix):
+        self.depth_ += 1
+
+    def end_figure(self, name):
+        self.depth_ -= 1
+
+    def render_image(self, name, stream):
+        if self.depth_ == 1:
+            self.images_.append(encode_stream(stream))
+
+    def render_char(
+        self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate
+    ):
+        adv = font.char_width(cid) * fontsize * scaling
+        if self.depth_:
+            return adv
+        try:
+            text = font.to_unichr(cid)
+        except PDFUnicodeNotDefined:
+            text = f'(cid:{cid})'
+        if font.is_vertical():
+            vx, vy = font.char_disp(cid)
+            vx = fontsize * 0.5 if vx is None else vx * fontsize * 0.001
+            vy = (1000 - vy) * fontsize * 0.001
+            lower_left, upper_right = (-vx, vy + rise + adv), (
+                -vx + fontsize,
+                vy + rise,
+            )
+        else:
+            descent = font.get_descent() * fontsize
+            lower_left, upper_right = (0, descent + rise), (
+                adv,
+                descent + rise + fontsize,
+            )
+        x0, y0 = apply_matrix_pt(matrix, lower_left)
+        x1, y1 = apply_matrix_pt(matrix, upper_right)
+        if x1 < x0:
+            x0, x1 = (x1, x0)
+        if y1 < y0:
+            y0, y1 = (y1, y0)
+        self.chars_.append((x0, y0, x1, y1, text, font.fontname))
+        return adv
+
+    def get_result(self):
+        return self.result_
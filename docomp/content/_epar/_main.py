@@ -5,6 +5,22 @@ content from it.
 
 # Author: Georgios Douzas <gdouzas@icloud.com>
 
+import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextvars import copy_context
+
+from .._instrumentation import (
+    NULL_INSTRUMENTATION,
+    EventsRecorder,
+    get_instrumentation,
+    instrument,
+    span,
+)
 from ._downloading import EPARDownloader
 from ._extraction import (
     SectionExtractor,
@@ -14,10 +30,40 @@ from ._extraction import (
 )
 
 
-def extract_epar_content(product, language='en'):
-    """Download and extract content from the EPAR document."""
+def _extract_streamed_content(pages, store):
+    """Extract content from a stream of pages in a single pass."""
+
+    labelling_html_extractor = LabellingHTMLExtractor()
+    labelling_images_extractor = ImagesExtractor(store=store)
+    leaflet_html_extractor = LeafletHTMLExtractor()
+    leaflet_images_extractor = ImagesExtractor(store=store)
+    sections_extractors = {
+        'labelling': (labelling_html_extractor, labelling_images_extractor),
+        'leaflet': (leaflet_html_extractor, leaflet_images_extractor),
+    }
 
-    pages = EPARDownloader(product, language).downloaded_data_
+    # Feed the pages of each section to its extractors
+    for section, page in SectionExtractor().iter_sections(pages):
+        for extractor in sections_extractors[section]:
+            extractor.partial_extract(page)
+
+    # Extract content
+    doc_dict = {
+        'labelling': {
+            'html': labelling_html_extractor.extracted_data_,
+            'images': labelling_images_extractor.extracted_data_,
+        },
+        'leafleat': {
+            'html': leaflet_html_extractor.extracted_data_,
+            'images': leaflet_images_extractor.extracted_data_,
+        },
+    }
+
+    return doc_dict
+
+
+def _extract_content(pages, store):
+    """Extract content from the pages."""
 
     # Identify sections
     labelling_pages, leaflet_pages = SectionExtractor(pages).extracted_data_
@@ -26,12 +72,158 @@ def extract_epar_content(product, language='en'):
     doc_dict = {
         'labelling': {
             'html': LabellingHTMLExtractor(labelling_pages).extracted_data_,
-            'images': ImagesExtractor(labelling_pages).extracted_data_,
+            'images': ImagesExtractor(labelling_pages, store).extracted_data_,
         },
         'leafleat': {
             'html': LeafletHTMLExtractor(leaflet_pages).extracted_data_,
-            'images': ImagesExtractor(leaflet_pages).extracted_data_,
+            'images': ImagesExtractor(leaflet_pages, store).extracted_data_,
         },
     }
 
     return doc_dict
+
+
+def _retrieve(product, language):
+    """Retrieve the EPAR pdf of a product and whether it is unchanged."""
+    downloader = EPARDownloader(product, language)
+    download_url, data = downloader.retrieve()
+    return download_url, data, downloader.unchanged_
+
+
+def _extract_retrieved_content(
+    product, language, download_url, data, stream, record=False
+):
+    """Parse the retrieved EPAR pdf and extract its content, the store of its
+    images and the recorded instrumentation events."""
+    recorder = EventsRecorder() if record else NULL_INSTRUMENTATION
+    store = ImagesExtractor.create_store()
+    with instrument(recorder):
+        with span('extract_epar_content', product=product, language=language):
+            pages = EPARDownloader(product, language).iter_pages(download_url, data)
+            if stream:
+                content = _extract_streamed_content(pages, store)
+            else:
+                content = _extract_content(list(pages), store)
+    return content, store, recorder.events_ if record else []
+
+
+def _attach_images(content, store):
+    """Attach the images of the extracted content to a store."""
+    for section_content in content.values():
+        section_content['images'] = store.attach(section_content['images'])
+    return content
+
+
+def extract_epar_content(product, language='en', stream=False, store=None):
+    """Download and extract content from the EPAR document.
+
+    When ``stream`` is ``True`` the pages are parsed and consumed one at a time
+    instead of being kept in memory. The images are added to ``store`` or to a
+    new store of the document when it is ``None``. The stages are reported to
+    the instrumentation of the ``instrument`` context manager.
+    """
+
+    store = ImagesExtractor.create_store() if store is None else store
+    with span('extract_epar_content', product=product, language=language):
+        downloader = EPARDownloader(product, language)
+        if stream:
+            return _extract_streamed_content(downloader.stream(), store)
+
+        return _extract_content(downloader.downloaded_data_, store)
+
+
+def extract_epar_contents(
+    products_languages,
+    n_download_jobs=4,
+    n_jobs=None,
+    stream=False,
+    skip_unchanged=False,
+    prefetch_factor=2,
+    store=None,
+):
+    """Download and extract content from the EPAR documents of many products.
+
+    The documents are downloaded concurrently by ``n_download_jobs`` threads,
+    while their parsing and extraction run on a pool of ``n_jobs`` processes.
+    At most ``prefetch_factor`` documents per process are downloaded or waiting
+    for extraction at any time, so that the retrieved pdfs do not accumulate in
+    memory when downloading is faster than extraction. The tuples
+    ``(product, language, content, error)`` are yielded as the documents are
+    completed. Errors are captured per document, so ``content`` is ``None`` and
+    ``error`` is the raised exception for failed documents. When
+    ``skip_unchanged`` is ``True`` the documents with an unchanged cached
+    fingerprint are neither extracted nor yielded. Closing the generator
+    cancels the pending downloads and extractions.
+
+    The images of each document are returned from its extraction process with
+    a store of the document only, since the references of the images are
+    serialized without their store. They are merged to ``store`` when it is
+    given, otherwise each content keeps the store of its document.
+    """
+
+    if not isinstance(prefetch_factor, int) or prefetch_factor < 1:
+        raise ValueError(
+            'Parameter `prefetch_factor` should be a positive integer.'
+            f'\n\nInstead {prefetch_factor} was given.'
+        )
+    products_languages = iter(products_languages)
+    instrumentation = get_instrumentation()
+    max_in_flight = prefetch_factor * (os.cpu_count() if n_jobs is None else n_jobs)
+    download_executor = ThreadPoolExecutor(n_download_jobs)
+    extract_executor = ProcessPoolExecutor(n_jobs)
+    futures = {}
+
+    def submit_downloads():
+        n_downloads = sum(is_download for *_, is_download in futures.values())
+        while len(futures) < max_in_flight and n_downloads < n_download_jobs:
+            product_language = next(products_languages, None)
+            if product_language is None:
+                return
+            product, language = product_language
+            future = download_executor.submit(
+                copy_context().run, _retrieve, product, language
+            )
+            futures[future] = product, language, True
+            n_downloads += 1
+
+    try:
+
+        # Download documents
+        submit_downloads()
+
+        # Extract content of downloaded documents
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                product, language, is_download = futures.pop(future)
+                error = future.exception()
+                if error is not None:
+                    yield product, language, None, error
+                elif is_download:
+                    download_url, data, unchanged = future.result()
+                    if skip_unchanged and unchanged:
+                        continue
+                    future = extract_executor.submit(
+                        _extract_retrieved_content,
+                        product,
+                        language,
+                        download_url,
+                        data,
+                        stream,
+                        instrumentation is not NULL_INSTRUMENTATION,
+                    )
+                    futures[future] = product, language, False
+                else:
+                    content, document_store, events = future.result()
+                    instrumentation.replay(events)
+                    if store is not None:
+                        document_store = store.merge(document_store)
+                    content = _attach_images(content, document_store)
+                    yield product, language, content, None
+            submit_downloads()
+
+    finally:
+        for future in futures:
+            future.cancel()
+        for executor in (download_executor, extract_executor):
+            executor.shutdown(wait=not futures)
@@ -0,0 +1,195 @@
+"""
+Includes classes and functions to mirror the EMA documents locally.
+"""
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+import asyncio
+import json
+import os
+
+from .._cache import FileCache, hash_key
+from .._instrumentation import count, span
+from .._utils import check_param
+from ._downloading import (
+    VALIDATORS,
+    AsyncEPARDownloader,
+    extract_download_urls,
+    index_report,
+    read_report,
+    resolve_mirrored_url,
+    scrape_download_urls,
+)
+
+
+class EMAMirror:
+    """Local mirror of the EMA medicines report, product pages and EPAR pdfs.
+
+    Each url is stored as a file named after its hash and the validators of
+    its response are recorded in an index, so that updates send conditional
+    requests and transfer only the changed documents. The transfers run in
+    parallel through the HTTP client of ``AsyncEPARDownloader``. The mirror is
+    used by the downloaders when the ``mirror_path`` of the ``epar_downloader``
+    configuration is set to its path.
+
+    Parameters
+    ----------
+    path : str
+        The path of the mirror directory.
+    """
+
+    INDEX_NAME_ = 'index.json'
+
+    def __init__(self, path):
+        self.path = path
+
+    def __contains__(self, url):
+        return hash_key(url) in self.files_
+
+    @property
+    def files_(self):
+        """Get the files of the mirrored urls."""
+        return FileCache(self.path)
+
+    @property
+    def index_(self):
+        """Get the mapping from mirrored url to the validators of its
+        response."""
+        try:
+            with open(os.path.join(self.path, self.INDEX_NAME_)) as index_file:
+                return json.load(index_file)
+        except FileNotFoundError:
+            return {}
+
+    def _save_index(self, index):
+        """Save the validators of the mirrored urls."""
+        self.files_.set(self.INDEX_NAME_, json.dumps(index).encode())
+
+    def resolve(self, url):
+        """Resolve a url to the uri of its mirrored file."""
+        return resolve_mirrored_url(self.path, url)
+
+    def read(self, url):
+        """Read the mirrored content of a url."""
+        data = self.files_.get(hash_key(url))
+        if data is None:
+            raise FileNotFoundError(f'The url {url} is not mirrored in {self.path}.')
+        return data
+
+    async def _afetch(self, client, url, index):
+        """Mirror a url with a conditional request and get whether it was
+        updated."""
+        headers = {}
+        validators = index.get(url, {}) if url in self else {}
+        if validators.get('ETag') is not None:
+            headers['If-None-Match'] = validators['ETag']
+        if validators.get('Last-Modified') is not None:
+            headers['If-Modified-Since'] = validators['Last-Modified']
+        with span('mirror', url=url):
+            status, response_headers, data = await client.fetch(url, headers)
+        if status == 304:
+            count('mirror.unchanged')
+            return False
+        response_headers = {
+            name.lower(): value for name, value in response_headers.items()
+        }
+        self.files_.set(hash_key(url), data)
+        index[url] = {name: response_headers.get(name.lower()) for name in VALIDATORS}
+        count('mirror.updated')
+        count('bytes.mirror', len(data))
+        return True
+
+    async def _afetch_many(self, client, urls, index):
+        """Mirror many urls in parallel and get the ``(url, updated, error)``
+        tuples."""
+
+        async def afetch(url):
+            try:
+                return url, await self._afetch(client, url, index), None
+            except Exception as error:
+                return url, None, error
+
+        return await asyncio.gather(*[afetch(url) for url in urls])
+
+    def _find_products_urls(self, products):
+        """Find the main urls of the products from the mirrored report."""
+        downloader = AsyncEPARDownloader
+        products_urls = index_report(
+            self.resolve(downloader.REPORT_URL_),
+            downloader.SKIPROWS_,
+            downloader.USECOLS_,
+        )
+        if products is None:
+            return products_urls
+        return {
+            product: products_urls[product]
+            for product in [
+                check_param('product', product.capitalize(), products_urls)
+                for product in products
+            ]
+        }
+
+    def _find_download_urls(self, products_urls, languages):
+        """Find the download urls of the EPAR pdfs from the mirrored product
+        pages."""
+        download_urls = []
+        for product, main_url in products_urls.items():
+            if main_url not in self:
+                continue
+            urls = extract_download_urls(
+                self.read(main_url),
+                AsyncEPARDownloader.PRODUCT_URL_.format(product.lower()),
+            )
+            download_urls += [
+                url
+                for language, url in urls.items()
+                if languages is None or language in languages
+            ]
+        return download_urls
+
+    async def aupdate(self, products=None, languages=None, client=None):
+        """Update asynchronously the mirror of the report and of the product
+        pages and EPAR pdfs of the products and languages.
+
+        All the authorised products and their languages are mirrored when
+        ``products`` and ``languages`` are ``None``. The tuples
+        ``(url, updated, error)`` of the mirrored urls are returned, where
+        ``updated`` is ``False`` for unchanged urls.
+        """
+        owns_client = client is None
+        client = AsyncEPARDownloader.create_client() if owns_client else client
+        index = self.index_
+        try:
+
+            # Report
+            report_url = AsyncEPARDownloader.REPORT_URL_
+            results = await self._afetch_many(client, [report_url], index)
+            if results[0][1]:
+                read_report.cache_clear()
+                index_report.cache_clear()
+            if report_url not in self:
+                return results
+
+            # Product pages
+            products_urls = self._find_products_urls(products)
+            products_results = await self._afetch_many(
+                client, list(products_urls.values()), index
+            )
+            if any(updated for _, updated, _ in products_results):
+                scrape_download_urls.cache_clear()
+            results += products_results
+
+            # EPAR pdfs
+            download_urls = self._find_download_urls(products_urls, languages)
+            results += await self._afetch_many(client, download_urls, index)
+
+        finally:
+            self._save_index(index)
+            if owns_client:
+                client.close()
+        return results
+
+    def update(self, products=None, languages=None):
+        """Update the mirror of the report and of the product pages and EPAR
+        pdfs of the products and languages."""
+        return asyncio.run(self.aupdate(products, languages))
@@ -2,23 +2,41 @@
 Test the _downloading module.
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from os import listdir
 from os.path import join
+from pathlib import Path
 from urllib.parse import urljoin
 
 import pytest
 import pandas as pd
 from pdfminer.high_level import extract_pages
 from pdfminer.layout import LAParams
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter
 
 from docomp.content._utils import check_param
-from docomp.content._epar._downloading import EPARDownloader
+from docomp.content._epar._extraction import PageIndex, SectionExtractor
+from docomp.content._epar._downloading import (
+    AsyncEPARDownloader,
+    EPARDownloader,
+    read_report,
+    index_report,
+    locate_sections,
+    _resolve_outline_page_number,
+    extract_download_urls,
+    scrape_download_urls,
+    spool_response,
+)
 from docomp import CONFIG
 
 DOWNLOADING_PATH = join(
     'docomp', 'content', '_epar', 'tests', 'resources', 'downloading'
 )
 REPORT_PATH = join(DOWNLOADING_PATH, 'report.xlsx')
+EXTRACTION_PATH = join('docomp', 'content', '_epar', 'tests', 'resources', 'extraction')
 PDFS = [
     file_name for file_name in listdir(DOWNLOADING_PATH) if file_name.endswith('.pdf')
 ]
@@ -28,6 +46,7 @@ BASE_URL = CONFIG['base_url'].get(str)
 PRODUCT_URL = CONFIG['epar_downloader']['product_url'].get(str)
 BOXES_FLOW = CONFIG['epar_downloader']['boxes_flow'].get()
 CHAR_MARGIN = CONFIG['epar_downloader']['char_margin'].get(float)
+SECTIONS_TITLES = CONFIG['epar_downloader']['sections_titles'].get(list)
 
 
 @pytest.mark.parametrize('product', ['test', None])
@@ -129,3 +148,419 @@ def test_downloader(product, language, monkeypatch):
     assert epar_downloader.main_url_ == join(
         BASE_URL, f'{language}/medicines/human/EPAR/{product.lower()}'
     )
+
+
+def test_extract_download_urls():
+    """Test the extraction of the download urls from a product page."""
+    path_prefix = PRODUCT_URL.format('evista')
+    html = (
+        f'<html><body><a>empty</a><a href="/other/evista_en.pdf">other</a>'
+        f'<div><a class="link" href="{urljoin(BASE_URL, path_prefix)}_en.pdf">'
+        f'<span>English</span></a></div><p>text &amp; more</p>'
+        f'<a href="{path_prefix}_fr.pdf">French</a></body></html>'
+    )
+    assert extract_download_urls(html, path_prefix) == {
+        'en': f'{urljoin(BASE_URL, path_prefix)}_en.pdf',
+        'fr': f'{path_prefix}_fr.pdf',
+    }
+    assert extract_download_urls(html.encode(), path_prefix) == (
+        extract_download_urls(html, path_prefix)
+    )
+    assert extract_download_urls(html, PRODUCT_URL.format('azarga')) == {}
+
+
+def test_downloader_download_urls(http_server, monkeypatch):
+    """Test that the product page is scraped once for all the languages."""
+
+    path_prefix = PRODUCT_URL.format('evista')
+    http_server.files['/evista'] = ''.join(
+        f'<a href="{http_server.base_url}{path_prefix}_{language}.pdf">{language}</a>'
+        for language in ('en', 'fr', 'de')
+    ).encode()
+
+    def mock_main_url(self):
+        self.product_ = check_param('product', self.product.capitalize(), ['Evista'])
+        return f'{http_server.base_url}/evista'
+
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.main_url_',
+        property(mock_main_url),
+    )
+
+    scrape_download_urls.cache_clear()
+    download_urls = [
+        EPARDownloader('evista', language).download_url_
+        for language in ('en', 'FR', 'de')
+    ]
+    assert download_urls == [
+        f'{http_server.base_url}{path_prefix}_{language}.pdf'
+        for language in ('en', 'fr', 'de')
+    ]
+    assert set(EPARDownloader('evista').download_urls_) == {'en', 'fr', 'de'}
+    assert [path for _, path, _ in http_server.requests] == ['/evista']
+    with pytest.raises(ValueError, match='Instead it was given.$'):
+        EPARDownloader('evista', 'it').download_url_
+
+
+def test_downloader_report_cache(monkeypatch):
+    """Test that the report is read once and shared by concurrent downloaders."""
+
+    read_report.cache_clear()
+    index_report.cache_clear()
+    calls = []
+    read_excel = pd.read_excel
+
+    def mock_read_excel(*args, **kwargs):
+        calls.append(args)
+        return read_excel(*args, **kwargs)
+
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.pd.read_excel', mock_read_excel
+    )
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.REPORT_URL_', REPORT_PATH
+    )
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.SKIPROWS_', None
+    )
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.USECOLS_', None
+    )
+
+    products = ['azarga', 'evista'] * 4
+    with ThreadPoolExecutor(len(products)) as executor:
+        main_urls = list(
+            executor.map(lambda product: EPARDownloader(product).main_url_, products)
+        )
+    assert len(calls) == 1
+    assert main_urls == [
+        join(BASE_URL, f'en/medicines/human/EPAR/{product}') for product in products
+    ]
+    assert 'Azarga' in EPARDownloader('azarga').available_products_
+
+
+def test_downloader_cache(tmp_path, monkeypatch, local_pdfs):
+    """Test the caching of the downloaded and parsed pdf."""
+
+    pdf_path = Path(DOWNLOADING_PATH, 'evista_sections_en.pdf').resolve()
+    local_pdfs(join('downloading', 'evista_sections_en.pdf'))
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.CACHE_PATH_', str(tmp_path)
+    )
+
+    downloader = EPARDownloader('evista')
+    pages = downloader.download()
+    fingerprint = downloader.fingerprint_
+    assert fingerprint['url'] == pdf_path.as_uri()
+    assert fingerprint['size'] == pdf_path.stat().st_size
+    assert len(fingerprint['pages']) == len(pages)
+    assert len(listdir(tmp_path)) == 2 + len(set(fingerprint['pages']))
+
+    processed = []
+    process_page = PDFPageInterpreter.process_page
+    monkeypatch.setattr(
+        PDFPageInterpreter,
+        'process_page',
+        lambda self, page: processed.append(page) or process_page(self, page),
+    )
+    cached_pages = EPARDownloader('evista').download()
+    assert not processed
+    assert [page.pageid for page in cached_pages] == [page.pageid for page in pages]
+    assert [page.text for page in cached_pages] == [page.text for page in pages]
+    assert [page.flags for page in cached_pages] == [page.flags for page in pages]
+
+
+def test_downloader_device(monkeypatch, local_pdfs):
+    """Test the selection of the pdfminer device."""
+
+    local_pdfs(join('downloading', 'evista_sections_en.pdf'))
+    pages = list(EPARDownloader('evista').stream())
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.DEVICE_', 'text_lines'
+    )
+    text_lines_pages = EPARDownloader('evista').download()
+    assert [page.__getstate__() for page in text_lines_pages] == [
+        page.__getstate__() for page in pages
+    ]
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.DEVICE_', 'test'
+    )
+    with pytest.raises(ValueError, match='Instead test was given.$'):
+        EPARDownloader('evista').download()
+
+
+def test_downloader_fingerprint(http_server, tmp_path, monkeypatch):
+    """Test that unchanged pdfs are not downloaded again."""
+
+    path = PRODUCT_URL.format('evista') + '_en.pdf'
+    with open(join(DOWNLOADING_PATH, 'evista_sections_en.pdf'), 'rb') as pdf_file:
+        http_server.files[path] = pdf_file.read()
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.download_url_',
+        http_server.base_url + path,
+    )
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.CACHE_PATH_', str(tmp_path)
+    )
+
+    downloader = EPARDownloader('evista')
+    _, data = downloader.retrieve()
+    assert not downloader.unchanged_
+    assert downloader.fingerprint_['ETag'] is not None
+    assert [method for method, *_ in http_server.requests] == ['GET']
+
+    _, cached_data = downloader.retrieve()
+    assert downloader.unchanged_ and cached_data == data
+    assert [method for method, *_ in http_server.requests] == ['GET', 'HEAD']
+
+    http_server.files[path] = data + b'\n'
+    _, changed_data = downloader.retrieve()
+    assert not downloader.unchanged_ and changed_data == data + b'\n'
+    assert [method for method, *_ in http_server.requests][2:] == ['HEAD', 'GET']
+
+
+class MockResponse(BytesIO):
+    """Response with the headers of the content length."""
+
+    def __init__(self, data, headers):
+        super(MockResponse, self).__init__(data)
+        self.headers = headers
+
+
+@pytest.mark.parametrize(
+    'max_memory_size,headers,rolled',
+    [
+        (None, {}, False),
+        (5, {}, False),
+        (3, {}, True),
+        (5, {'Content-Length': '6'}, True),
+        (0, {}, True),
+    ],
+)
+def test_spool_response(max_memory_size, headers, rolled, tmp_path):
+    """Test the bounded buffer of the streamed responses."""
+    pdf_file = spool_response(
+        MockResponse(b'data', headers), max_memory_size, str(tmp_path)
+    )
+    with pdf_file:
+        assert pdf_file._rolled == rolled
+        assert pdf_file.read() == b'data'
+    assert pdf_file.closed and not listdir(tmp_path)
+
+
+@pytest.mark.parametrize('max_memory_size', [None, 0])
+def test_downloader_spool(max_memory_size, tmp_path, monkeypatch, local_pdfs):
+    """Test that the downloaded pdf is parsed from the buffer and that no
+    temporary file is left behind."""
+
+    pdf_path = Path(DOWNLOADING_PATH, 'evista_sections_en.pdf').resolve()
+    local_pdfs(join('downloading', 'evista_sections_en.pdf'))
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.MAX_MEMORY_SIZE_',
+        max_memory_size,
+    )
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.SPOOL_PATH_', str(tmp_path)
+    )
+
+    downloader = EPARDownloader('evista')
+    download_url, pdf_file = downloader.open_pdf()
+    with pdf_file:
+        assert download_url == pdf_path.as_uri()
+        assert pdf_file.read() == pdf_path.read_bytes()
+    pages = list(downloader.stream())
+    assert [page.pageid for page in pages] == [
+        page.pageid for page in downloader.download()
+    ]
+    assert not listdir(tmp_path)
+
+
+def test_downloader_pages_cache(tmp_path, monkeypatch, local_pdfs):
+    """Test the reuse of the cached layouts of unchanged pages."""
+
+    local_pdfs(join('downloading', 'evista_sections_en.pdf'))
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.CACHE_PATH_', str(tmp_path)
+    )
+    processed = []
+    process_page = PDFPageInterpreter.process_page
+    monkeypatch.setattr(
+        PDFPageInterpreter,
+        'process_page',
+        lambda self, page: processed.append(page) or process_page(self, page),
+    )
+
+    pages = EPARDownloader('evista').download()
+    num_processed = len(processed)
+    assert 0 < num_processed <= len(pages)
+
+    # Parse the other pages of the pdf
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.LOCATE_SECTIONS_', False
+    )
+    all_pages = EPARDownloader('evista').download()
+    assert len(processed) == num_processed + len(all_pages) - len(pages)
+    assert [page.text for page in all_pages[len(all_pages) - len(pages):]] == [
+        page.text for page in pages
+    ]
+
+
+def test_async_downloader(http_server, monkeypatch):
+    """Test the asynchronous EPAR downloader against a local server."""
+
+    for pdf in PDFS:
+        product, language = pdf.replace('.pdf', '').split('_')[::2]
+        with open(join(DOWNLOADING_PATH, pdf), 'rb') as pdf_file:
+            http_server.files[f'{PRODUCT_URL.format(product)}_{language}.pdf'] = (
+                pdf_file.read()
+            )
+        http_server.files[f'/{product}'] = ''.join(
+            f'<a href="{http_server.base_url}{path}">{path}</a>'
+            for path in http_server.files
+            if path.startswith(PRODUCT_URL.format(product))
+        ).encode()
+    http_server.interruptions[PRODUCT_URL.format('evista') + '_en.pdf'] = 1
+
+    def mock_main_url(self):
+        self.product_ = check_param(
+            'product', self.product.capitalize(), ['Azarga', 'Evista']
+        )
+        return f'{http_server.base_url}/{self.product.lower()}'
+
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.main_url_',
+        property(mock_main_url),
+    )
+
+    download_url, data = AsyncEPARDownloader('evista').retrieve()
+    assert download_url.endswith(PRODUCT_URL.format('evista') + '_en.pdf')
+    assert data == http_server.files[PRODUCT_URL.format('evista') + '_en.pdf']
+    pages = AsyncEPARDownloader('azarga').download()
+    assert [page.pageid for page in pages] == list(range(1, 15))
+
+    n_requests = len(http_server.requests)
+    results = asyncio.run(
+        AsyncEPARDownloader.aretrieve_many(
+            [('azarga', 'en'), ('azarga', 'fr'), ('test', 'en')]
+        )
+    )
+    assert [result[:2] for result in results] == [
+        ('azarga', 'en'),
+        ('azarga', 'fr'),
+        ('test', 'en'),
+    ]
+    assert (
+        results[0][2][1] == http_server.files[PRODUCT_URL.format('azarga') + '_en.pdf']
+    )
+    assert results[0][3] is None
+    assert results[1][2] is None and isinstance(results[1][3], ValueError)
+    assert results[2][2] is None and isinstance(results[2][3], ValueError)
+    assert [
+        path for _, path, _ in http_server.requests[n_requests:] if path == '/azarga'
+    ] == ['/azarga']
+
+
+def test_async_downloader_changed_content(http_server, tmp_path, monkeypatch):
+    """Test that the asynchronous downloader records the validators, so that a
+    changed pdf of the same size is downloaded again."""
+
+    pdf_path = PRODUCT_URL.format('evista') + '_en.pdf'
+    http_server.files[pdf_path] = b'%PDF-1.4 first'
+    http_server.files['/evista'] = (
+        f'<a href="{http_server.base_url}{pdf_path}">{pdf_path}</a>'.encode()
+    )
+
+    def mock_main_url(self):
+        self.product_ = 'Evista'
+        return f'{http_server.base_url}/evista'
+
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.main_url_',
+        property(mock_main_url),
+    )
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.CACHE_PATH_', str(tmp_path)
+    )
+
+    downloader = AsyncEPARDownloader('evista')
+    assert downloader.retrieve()[1] == b'%PDF-1.4 first'
+    assert downloader.fingerprint_['ETag'] is not None
+    assert downloader.retrieve()[1] == b'%PDF-1.4 first'
+    http_server.files[pdf_path] = b'%PDF-1.4 other'
+    assert downloader.retrieve()[1] == b'%PDF-1.4 other'
+    assert [
+        method for method, path, _ in http_server.requests if path == pdf_path
+    ] == ['GET', 'HEAD', 'HEAD', 'GET']
+
+
+@pytest.mark.parametrize('product', ['azarga', 'evista'])
+@pytest.mark.parametrize('locate', [True, False])
+def test_downloader_locate_sections(product, locate, monkeypatch, local_pdfs):
+    """Test the restriction of layout analysis to the located sections."""
+
+    pdf_path = Path(EXTRACTION_PATH, f'{product}_en.pdf').resolve()
+    local_pdfs(join('extraction', '{product}_en.pdf'))
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.LOCATE_SECTIONS_', locate
+    )
+
+    pages = EPARDownloader(product).download()
+    all_pages = list(
+        extract_pages(
+            str(pdf_path),
+            laparams=LAParams(boxes_flow=BOXES_FLOW, char_margin=CHAR_MARGIN),
+        )
+    )
+    with open(pdf_path, 'rb') as pdf_file:
+        titles_page_numbers, page_numbers = locate_sections(pdf_file, SECTIONS_TITLES)
+    start, *_, end = page_numbers
+    assert start == titles_page_numbers[0] == 16 and end == len(all_pages) - 1
+    expected_pages = all_pages[start:] if locate else all_pages
+    assert [page.pageid for page in pages] == [page.pageid for page in expected_pages]
+    assert all(isinstance(page, PageIndex) for page in pages)
+    assert [page.text for page in pages] == [
+        PageIndex(page).text for page in expected_pages
+    ]
+
+
+@pytest.mark.parametrize('product,language', PRODUCTS_LANGUAGES)
+def test_locate_sections_misleading_outline(product, language, monkeypatch):
+    """Test that the outline items are selected by their titles."""
+
+    pdf_path = Path(DOWNLOADING_PATH, f'{product}_sections_{language}.pdf')
+    with open(pdf_path, 'rb') as pdf_file:
+        expected = locate_sections(pdf_file, SECTIONS_TITLES)
+    get_outlines = PDFDocument.get_outlines
+
+    def mock_get_outlines(document):
+        outlines = list(get_outlines(document))
+        return outlines + [(1, 'ANNEX IV', *outlines[0][2:])]
+
+    monkeypatch.setattr(PDFDocument, 'get_outlines', mock_get_outlines)
+    with open(pdf_path, 'rb') as pdf_file:
+        assert locate_sections(pdf_file, SECTIONS_TITLES) == expected
+    with open(pdf_path, 'rb') as pdf_file:
+        assert locate_sections(pdf_file, ['ANNEX', 'B.']) is None
+
+
+@pytest.mark.parametrize('product', ['azarga', 'evista'])
+def test_downloader_locate_sections_fallback(product, monkeypatch, local_pdfs):
+    """Test that all the pages are parsed when the located pages are not the
+    title pages of the sections."""
+
+    pdf_path = Path(EXTRACTION_PATH, f'{product}_en.pdf').resolve()
+    local_pdfs(join('extraction', '{product}_en.pdf'))
+    resolve_outline_page_number = _resolve_outline_page_number
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading._resolve_outline_page_number',
+        lambda *args: resolve_outline_page_number(*args) + 1,
+    )
+    with open(pdf_path, 'rb') as pdf_file:
+        titles_page_numbers, _ = locate_sections(pdf_file, SECTIONS_TITLES)
+    assert titles_page_numbers[0] == 17
+
+    pages = EPARDownloader(product).download()
+    num_pages = len(list(extract_pages(str(pdf_path))))
+    assert [page.pageid for page in pages] == list(range(1, num_pages + 1))
+    labelling_pages, leaflet_pages = SectionExtractor(pages).extracted_data_
+    assert labelling_pages and leaflet_pages
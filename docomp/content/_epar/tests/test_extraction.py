@@ -2,15 +2,29 @@
 Test the _downloading module.
 """
 
+import pickle
+from copy import copy
+from io import StringIO
 from os import listdir
 from os.path import join
 
 import pytest
 from bs4 import BeautifulSoup
 from pdfminer.high_level import extract_pages
-from pdfminer.layout import LAParams
+from pdfminer.layout import LAParams, LTTextContainer, LTFigure
 
-from docomp.content._epar._extraction import SectionExtractor, LabellingHTMLExtractor
+from docomp.content._images import ImageStore, encode_stream
+from docomp.content._epar._extraction import (
+    BOLD,
+    ITALIC,
+    PageIndex,
+    SectionExtractor,
+    LabellingHTMLExtractor,
+    ImagesExtractor,
+    font_flags,
+    fontnames_flags,
+    index_page,
+)
 from docomp import CONFIG
 
 EXTRACTION_PATH = join('docomp', 'content', '_epar', 'tests', 'resources', 'extraction')
@@ -58,3 +72,194 @@ def test_labelling_html_extractor(product, language):
             html_file.read(), features='html.parser'
         ).find_all('p')
     assert extracted_html == expected_html
+
+
+@pytest.mark.parametrize('product,language', PRODUCTS_LANGUAGES)
+def test_section_extractor_iter_sections(product, language):
+    """Test the incremental identification of sections."""
+    pages = PAGES_MAPPING[(product, language)]
+    section_extractor = SectionExtractor()
+    sections = list(section_extractor.iter_sections(iter(pages)))
+    labelling_pages, leaflet_pages = SectionExtractor(pages).extracted_data_
+    assert (
+        section_extractor.sections_nums_ == SECTIONS_NUMS_MAPPING[(product, language)]
+    )
+    assert [page.pageid for section, page in sections if section == 'labelling'] == [
+        page.pageid for page in labelling_pages
+    ]
+    assert [page.pageid for section, page in sections if section == 'leaflet'] == [
+        page.pageid for page in leaflet_pages
+    ]
+
+
+@pytest.mark.parametrize('product,language', PRODUCTS_LANGUAGES)
+def test_section_extractor_raise_error_missing_title(product, language):
+    """Test the raise of error when the leaflet title page is missing."""
+    _, leaflet_num = SECTIONS_NUMS_MAPPING[(product, language)]
+    pages = PAGES_MAPPING[(product, language)][:leaflet_num - 1]
+    match = 'Title pages of sections labelling, leaflet should be found. Got 1'
+    with pytest.raises(ValueError, match=match):
+        SectionExtractor(pages).extract()
+    with pytest.raises(ValueError, match=match):
+        list(SectionExtractor().iter_sections(iter(pages)))
+
+
+@pytest.mark.parametrize('product,language', PRODUCTS_LANGUAGES)
+def test_labelling_html_extractor_partial_extract(product, language):
+    """Test the incremental extraction of the labelling html."""
+    first_section, _ = SectionExtractor(
+        PAGES_MAPPING[(product, language)]
+    ).extracted_data_
+    labelling_html_extractor = LabellingHTMLExtractor()
+    for page in first_section:
+        labelling_html_extractor.partial_extract(page)
+    assert (
+        labelling_html_extractor.extracted_data_
+        == LabellingHTMLExtractor(first_section).extracted_data_
+    )
+
+
+@pytest.mark.parametrize('product,language', PRODUCTS_LANGUAGES)
+def test_labelling_html_extractor_iter_html(product, language):
+    """Test the streaming of the labelling html."""
+    first_section, _ = SectionExtractor(
+        PAGES_MAPPING[(product, language)]
+    ).extracted_data_
+    html = LabellingHTMLExtractor(first_section).extracted_data_
+    html_elements = list(LabellingHTMLExtractor(iter(first_section)).iter_html())
+    assert len(html_elements) > 1 and ''.join(html_elements) == html
+    sink = LabellingHTMLExtractor(iter(first_section)).write_html(StringIO())
+    assert sink.getvalue() == html
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 1000])
+def test_labelling_html_extractor_feed(chunk_size):
+    """Test that the html does not depend on the split of the text."""
+    first_section, _ = SectionExtractor(
+        PAGES_MAPPING[PRODUCTS_LANGUAGES[0]]
+    ).extracted_data_
+    text = ''.join(part for page in first_section for part in index_page(page).text)
+    extractor = LabellingHTMLExtractor()
+    extractor._initialize()
+    starts = range(0, len(text), chunk_size)
+    html_elements = [
+        html_element
+        for start, end in zip(starts, [*starts[1:], len(text)])
+        for html_element in extractor._feed(text[start:end])
+    ]
+    html_elements += extractor._iter_elements(extractor._reset_text())
+    assert html_elements == list(extractor._iter_elements(text))
+
+
+def test_page_index_empty_lines():
+    """Test that the empty lines placed directly on the page are dropped."""
+    page = next(
+        page
+        for page in PAGES_MAPPING[('evista', 'en')]
+        if any(isinstance(element, LTTextContainer) for element in page)
+    )
+    line = copy(
+        next(
+            part
+            for element in page
+            if isinstance(element, LTTextContainer)
+            for part in element
+        )
+    )
+    line.set_bbox((line.x0, line.y0, line.x1, line.y0))
+    assert line.is_empty()
+    page_with_line = copy(page)
+    page_with_line._objs = [line, *page]
+    page_index, expected_page_index = PageIndex(page_with_line), PageIndex(page)
+    assert page_index.text == expected_page_index.text
+    assert page_index.bboxes == expected_page_index.bboxes
+    assert page_index.flags == expected_page_index.flags
+
+
+@pytest.mark.parametrize('product,language', PRODUCTS_LANGUAGES)
+def test_page_index(product, language):
+    """Test the classification of the parts of the pages."""
+    for page in PAGES_MAPPING[(product, language)]:
+        page_index = PageIndex(page)
+        assert index_page(page_index) is page_index
+        assert page_index.pageid == page.pageid
+        parts = [
+            part
+            for element in page
+            if isinstance(element, LTTextContainer)
+            for part in element
+        ]
+        assert page_index.text == [part.get_text() for part in parts]
+        assert list(page_index.bboxes) == pytest.approx(
+            [coordinate for part in parts for coordinate in part.bbox]
+        )
+        assert list(page_index.flags) == [font_flags(part) for part in parts]
+        assert page_index.image == [
+            encode_stream(part.stream)
+            for element in page
+            if isinstance(element, LTFigure)
+            for part in element
+        ]
+        loaded_page_index = pickle.loads(pickle.dumps(page_index))
+        assert loaded_page_index.text == page_index.text
+        assert loaded_page_index.text[0] is page_index.text[0]
+        assert loaded_page_index.image == page_index.image
+        assert b'pdfminer' not in pickle.dumps(page_index)
+
+
+def test_font_flags():
+    """Test the font flags of text parts."""
+    pages = PAGES_MAPPING[PRODUCTS_LANGUAGES[0]]
+    flags = {flag for page in pages for flag in PageIndex(page).flags}
+    assert flags <= {0, BOLD, ITALIC, BOLD | ITALIC}
+    assert fontnames_flags([]) == 0
+    assert fontnames_flags(['Arial-BoldItalic', 'Arial-BlackOblique']) == BOLD | ITALIC
+    assert fontnames_flags(['Arial-Bold', 'Arial']) == 0
+    assert BOLD in flags and 0 in flags
+
+
+def test_labelling_html_extractor_split_subsections():
+    """Test the split of subsections on page numbers and enumerated titles."""
+    subsections = [
+        ['TITLE', '1. NAME', 'Product', '2. SUBSTANCE', 'Substance'],
+        ['3. EXCIPIENTS', 'Lactose 12 ', '4. FORM', 'Tablets'],
+    ]
+    assert LabellingHTMLExtractor._split_subsections(subsections) == [
+        ['TITLE'],
+        ['1. NAME', 'Product'],
+        ['2. SUBSTANCE', 'Substance'],
+        ['3. EXCIPIENTS', 'Lactose '],
+        ['4. FORM', 'Tablets'],
+    ]
+
+
+@pytest.mark.parametrize('product,language', PRODUCTS_LANGUAGES)
+def test_section_extractor_find_sections_nums(product, language):
+    """Test that the pages after the title pages are not consumed."""
+    consumed_pageids = []
+
+    def iter_pages():
+        for page in PAGES_MAPPING[(product, language)]:
+            consumed_pageids.append(page.pageid)
+            yield page
+
+    sections_nums = SectionExtractor().find_sections_nums(iter_pages())
+    assert sections_nums == SECTIONS_NUMS_MAPPING[(product, language)]
+    assert consumed_pageids[-1] == sections_nums[-1]
+
+
+@pytest.mark.parametrize('product,language', PRODUCTS_LANGUAGES)
+def test_images_extractor(product, language):
+    """Test the extraction of the images to a shared store."""
+    pages = PAGES_MAPPING[(product, language)]
+    store = ImageStore()
+    images = ImagesExtractor(pages, store).extracted_data_
+    assert [image.data for image in images] == [
+        part.stream.get_data()
+        for page in extract_pages(join(EXTRACTION_PATH, f'{product}_{language}.pdf'))
+        for element in page
+        if isinstance(element, LTFigure)
+        for part in element
+    ]
+    assert ImagesExtractor(pages, store).extracted_data_ == images
+    assert len(store) == len(set(images))
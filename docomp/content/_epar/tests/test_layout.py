@@ -0,0 +1,70 @@
+"""
+Test the _layout module.
+"""
+
+from os.path import join
+
+import pytest
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LAParams
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+
+from docomp.content._epar._extraction import (
+    LabellingHTMLExtractor,
+    PageIndex,
+    SectionExtractor,
+)
+from docomp.content._epar._layout import TextLinesDevice
+from docomp import CONFIG
+
+RESOURCES_PATH = join('docomp', 'content', '_epar', 'tests', 'resources')
+PDFS = [
+    join(RESOURCES_PATH, 'downloading', 'azarga_sections_en.pdf'),
+    join(RESOURCES_PATH, 'extraction', 'azarga_en.pdf'),
+    join(RESOURCES_PATH, 'extraction', 'evista_en.pdf'),
+]
+CONFIG = CONFIG['content']['epar']['downloading']
+BOXES_FLOW = CONFIG['epar_downloader']['boxes_flow'].get()
+CHAR_MARGIN = CONFIG['epar_downloader']['char_margin'].get(float)
+
+
+def parse_pages(path, device_class):
+    """Parse the pages of a pdf with a device and index them."""
+    resource_manager = PDFResourceManager(caching=True)
+    device = device_class(
+        resource_manager,
+        laparams=LAParams(boxes_flow=BOXES_FLOW, char_margin=CHAR_MARGIN),
+    )
+    interpreter = PDFPageInterpreter(resource_manager, device)
+    pages = []
+    with open(path, 'rb') as pdf_file:
+        for pdf_page in PDFPage.get_pages(pdf_file):
+            interpreter.process_page(pdf_page)
+            page = device.get_result()
+            pages.append(page if isinstance(page, PageIndex) else PageIndex(page))
+    return pages
+
+
+@pytest.mark.parametrize('path', PDFS)
+def test_text_lines_device(path):
+    """Test that the text lines device indexes the pages like the layout
+    analysis."""
+    pages = parse_pages(path, TextLinesDevice)
+    layout_pages = parse_pages(path, PDFPageAggregator)
+    assert [page.__getstate__() for page in pages] == [
+        page.__getstate__() for page in layout_pages
+    ]
+    if 'extraction' in path:
+        labelling_pages, _ = SectionExtractor(pages).extract()
+        layout_labelling_pages, _ = SectionExtractor(layout_pages).extract()
+        assert (
+            LabellingHTMLExtractor(labelling_pages).extract()
+            == LabellingHTMLExtractor(layout_labelling_pages).extract()
+        )
+
+
+def test_text_lines_device_raise_error_boxes_flow():
+    """Test the raise of error for hierarchical grouping of boxes."""
+    with pytest.raises(ValueError, match='Parameter `boxes_flow` should be None'):
+        TextLinesDevice(PDFResourceManager(), laparams=LAParams(boxes_flow=0.5))
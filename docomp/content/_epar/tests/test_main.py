@@ -0,0 +1,170 @@
+"""
+Test the _main module.
+"""
+
+from os.path import join
+from pathlib import Path
+
+import pytest
+
+from docomp.content import (
+    MetricsRecorder,
+    extract_epar_content,
+    extract_epar_contents,
+    instrument,
+)
+from docomp.content._images import ImageStore
+
+EXTRACTION_PATH = join('docomp', 'content', '_epar', 'tests', 'resources', 'extraction')
+
+
+@pytest.mark.parametrize('product,language', [('azarga', 'en'), ('evista', 'en')])
+def test_extract_epar_content_stream(product, language, local_pdfs):
+    """Test that the streamed extraction produces the same content."""
+
+    local_pdfs()
+
+    content = extract_epar_content(product, language)
+    streamed_content = extract_epar_content(product, language, stream=True)
+    assert streamed_content == content
+    assert content['labelling']['html'].startswith('<p><b>')
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_extract_epar_contents(stream, local_pdfs):
+    """Test the batch extraction of content with errors captured per item."""
+
+    local_pdfs()
+
+    products_languages = [('azarga', 'en'), ('unknown', 'en'), ('evista', 'en')]
+    results = {
+        (product, language): (content, error)
+        for product, language, content, error in extract_epar_contents(
+            products_languages, n_download_jobs=2, n_jobs=2, stream=stream
+        )
+    }
+    assert set(results) == set(products_languages)
+    content, error = results[('unknown', 'en')]
+    assert content is None and isinstance(error, ValueError)
+    for product in ('azarga', 'evista'):
+        content, error = results[(product, 'en')]
+        assert error is None
+        assert content == extract_epar_content(product, 'en')
+    images = results[('azarga', 'en')][0]['leafleat']['images']
+    expected_images = extract_epar_content('azarga', 'en')['leafleat']['images']
+    assert [image.data for image in images] == [
+        image.data for image in expected_images
+    ]
+
+
+def test_extract_epar_contents_store(local_pdfs):
+    """Test that the images of the documents are merged to the given store."""
+
+    local_pdfs()
+
+    store = ImageStore()
+    results = {
+        product: content
+        for product, _, content, _ in extract_epar_contents(
+            [('azarga', 'en'), ('evista', 'en')], n_jobs=1, store=store
+        )
+    }
+    images = extract_epar_content('azarga', 'en')['leafleat']['images']
+    assert len(store) == len(set(images)) > 0
+    for content in results.values():
+        for section_content in content.values():
+            assert all(image.store is store for image in section_content['images'])
+    assert extract_epar_content('azarga', 'en', store=store) == results['azarga']
+    assert len(store) == len(set(images))
+
+
+def test_extract_epar_contents_backpressure(local_pdfs):
+    """Test that documents are downloaded only while the extractions keep up
+    and that closing the generator stops the downloads."""
+
+    local_pdfs(join('extraction', 'evista_en.pdf'))
+    consumed = []
+
+    def iter_products_languages():
+        for product in ('evista', 'azarga', 'evista', 'azarga'):
+            consumed.append(product)
+            yield product, 'en'
+
+    results = extract_epar_contents(
+        iter_products_languages(), n_download_jobs=4, n_jobs=1, prefetch_factor=1
+    )
+    product, language, content, error = next(results)
+    assert (product, language, error) == ('evista', 'en', None)
+    assert consumed == ['evista']
+    results.close()
+    assert consumed == ['evista']
+
+
+@pytest.mark.parametrize('prefetch_factor', [0, -1, 1.5])
+def test_extract_epar_contents_prefetch_factor(prefetch_factor):
+    """Test the validation of the prefetch factor."""
+    with pytest.raises(
+        ValueError, match='Parameter `prefetch_factor` should be a positive integer.'
+    ):
+        next(extract_epar_contents([('evista', 'en')], prefetch_factor=prefetch_factor))
+
+
+def test_extract_epar_contents_skip_unchanged(tmp_path, monkeypatch, local_pdfs):
+    """Test that documents with unchanged fingerprints are skipped."""
+
+    local_pdfs(join('extraction', 'azarga_en.pdf'))
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.CACHE_PATH_', str(tmp_path)
+    )
+
+    results = list(extract_epar_contents([('azarga', 'en')], skip_unchanged=True))
+    assert [result[:2] for result in results] == [('azarga', 'en')]
+    assert results[0][2] == extract_epar_content('azarga', 'en')
+    assert not list(extract_epar_contents([('azarga', 'en')], skip_unchanged=True))
+    results = list(extract_epar_contents([('azarga', 'en')]))
+    assert results[0][2] == extract_epar_content('azarga', 'en')
+
+
+def test_extract_epar_content_instrumentation(tmp_path, monkeypatch, local_pdfs):
+    """Test the metrics of the stages of the extraction."""
+
+    pdf_path = Path(EXTRACTION_PATH, 'evista_en.pdf').resolve()
+    local_pdfs(join('extraction', 'evista_en.pdf'))
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.CACHE_PATH_', str(tmp_path)
+    )
+
+    with instrument(MetricsRecorder()) as recorder:
+        extract_epar_content('evista', 'en')
+    assert recorder.counts_['bytes.download'] == pdf_path.stat().st_size
+    assert recorder.counts_['pages.parsed'] == len(recorder.spans_['layout']) > 0
+    assert recorder.counts_['cache.page.miss'] == recorder.counts_['pages.parsed']
+    assert recorder.counts_['pages.LabellingHTMLExtractor'] > 0
+    assert {
+        'extract_epar_content',
+        'download',
+        'extract.SectionExtractor',
+        'extract.LabellingHTMLExtractor.finalize',
+        'extract.ImagesExtractor.finalize',
+    } <= set(recorder.spans_)
+
+    with instrument(MetricsRecorder()) as recorder:
+        extract_epar_content('evista', 'en', stream=True)
+    assert recorder.counts_['cache.pdf.hit'] == 1
+    assert recorder.counts_['cache.page.hit'] > 0
+    assert 'pages.parsed' not in recorder.counts_
+    assert 'download' not in recorder.spans_ and 'layout' not in recorder.spans_
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_extract_epar_contents_instrumentation(stream, local_pdfs):
+    """Test that the events of the extraction processes are replayed."""
+
+    local_pdfs(join('extraction', 'evista_en.pdf'))
+
+    with instrument(MetricsRecorder()) as recorder:
+        list(extract_epar_contents([('evista', 'en')], n_jobs=1, stream=stream))
+    assert recorder.counts_['pages.parsed'] == len(recorder.spans_['layout']) > 0
+    assert recorder.counts_['pages.LabellingHTMLExtractor'] > 0
+    assert len(recorder.spans_['extract_epar_content']) == 1
+    assert 'download' in recorder.spans_
@@ -0,0 +1,140 @@
+"""
+Test the _mirror module.
+"""
+
+import asyncio
+from os.path import join
+
+import pytest
+
+from docomp.content import EMAMirror
+from docomp.content._epar._downloading import (
+    AsyncEPARDownloader,
+    EPARDownloader,
+    index_report,
+    read_report,
+    scrape_download_urls,
+)
+from docomp import CONFIG
+
+DOWNLOADING_PATH = join(
+    'docomp', 'content', '_epar', 'tests', 'resources', 'downloading'
+)
+REPORT_PATH = join(DOWNLOADING_PATH, 'report.xlsx')
+CONFIG = CONFIG['content']['epar']['downloading']
+BASE_URL = CONFIG['base_url'].get(str)
+PRODUCT_URL = CONFIG['epar_downloader']['product_url'].get(str)
+PRODUCTS = ['azarga', 'evista']
+
+
+@pytest.fixture
+def ema_server(http_server, monkeypatch):
+    """Local server of the report, the product pages and the EPAR pdfs."""
+
+    with open(REPORT_PATH, 'rb') as report_file:
+        http_server.files['/report.xlsx'] = report_file.read()
+    for product in PRODUCTS:
+        for language in ('en', 'fr'):
+            with open(
+                join(DOWNLOADING_PATH, f'{product}_sections_en.pdf'), 'rb'
+            ) as pdf:
+                http_server.files[f'{PRODUCT_URL.format(product)}_{language}.pdf'] = (
+                    pdf.read() + language.encode()
+                )
+        http_server.files[f'/en/medicines/human/EPAR/{product}'] = ''.join(
+            f'<a href="{http_server.base_url}{path}">{path}</a>'
+            for path in http_server.files
+            if path.startswith(PRODUCT_URL.format(product))
+        ).encode()
+
+    def mock_read_report(report_url, skiprows=None, usecols=None):
+        report = read_report.__wrapped__(report_url, skiprows, usecols)
+        return report.assign(
+            URL=report['URL'].str.replace(BASE_URL, f'{http_server.base_url}/')
+        )
+
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.read_report', mock_read_report
+    )
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.REPORT_URL_',
+        f'{http_server.base_url}/report.xlsx',
+    )
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.SKIPROWS_', None
+    )
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.USECOLS_', None
+    )
+    index_report.cache_clear()
+    scrape_download_urls.cache_clear()
+    yield http_server
+    index_report.cache_clear()
+    scrape_download_urls.cache_clear()
+
+
+def test_mirror_update(ema_server, tmp_path):
+    """Test the conditional update of the mirror."""
+
+    mirror = EMAMirror(str(tmp_path))
+    results = mirror.update(PRODUCTS, ['en'])
+    assert [(updated, error) for _, updated, error in results] == [(True, None)] * 5
+    assert {url.replace(ema_server.base_url, '') for url, _, _ in results} == {
+        '/report.xlsx',
+        '/en/medicines/human/EPAR/azarga',
+        '/en/medicines/human/EPAR/evista',
+        f'{PRODUCT_URL.format("azarga")}_en.pdf',
+        f'{PRODUCT_URL.format("evista")}_en.pdf',
+    }
+    pdf_path = f'{PRODUCT_URL.format("evista")}_en.pdf'
+    pdf_url = f'{ema_server.base_url}{pdf_path}'
+    assert pdf_url in mirror and f'{pdf_url[:-6]}fr.pdf' not in mirror
+    assert mirror.read(pdf_url) == ema_server.files[pdf_path]
+
+    # Unchanged documents
+    n_requests = len(ema_server.requests)
+    results = mirror.update(PRODUCTS, ['en'])
+    assert [(updated, error) for _, updated, error in results] == [(False, None)] * 5
+    assert all(
+        'If-None-Match' in headers for _, _, headers in ema_server.requests[n_requests:]
+    )
+
+    # Changed and new documents
+    ema_server.files[pdf_path] += b'new version'
+    results = mirror.update(['evista'])
+    assert [
+        url.replace(ema_server.base_url, '') for url, updated, _ in results if updated
+    ] == [f'{PRODUCT_URL.format("evista")}_{language}.pdf' for language in ('en', 'fr')]
+    assert mirror.read(pdf_url).endswith(b'new version')
+
+    # Errors
+    ema_server.failures[f'{PRODUCT_URL.format("azarga")}_fr.pdf'] = 10
+    results = asyncio.run(mirror.aupdate(['azarga'], ['fr']))
+    assert isinstance(results[-1][2], Exception)
+    with pytest.raises(ValueError, match='Instead Test was given.$'):
+        mirror.update(['test'])
+
+
+def test_mirror_offline(ema_server, tmp_path, monkeypatch):
+    """Test the offline mode of the downloaders."""
+
+    mirror = EMAMirror(str(tmp_path))
+    mirror.update(['evista'], ['en'])
+    monkeypatch.setattr(
+        'docomp.content._epar._downloading.EPARDownloader.MIRROR_PATH_', str(tmp_path)
+    )
+    index_report.cache_clear()
+    scrape_download_urls.cache_clear()
+    n_requests = len(ema_server.requests)
+
+    pdf_path = f'{PRODUCT_URL.format("evista")}_en.pdf'
+    download_url, data = EPARDownloader('evista').retrieve()
+    assert download_url == f'{ema_server.base_url}{pdf_path}'
+    assert data == ema_server.files[pdf_path]
+    assert AsyncEPARDownloader('evista').retrieve() == (download_url, data)
+    assert [page.pageid for page in EPARDownloader('evista').download()]
+    with pytest.raises(FileNotFoundError, match='is not mirrored'):
+        EPARDownloader('evista', 'fr').retrieve()
+    with pytest.raises(FileNotFoundError, match='is not mirrored'):
+        EPARDownloader('azarga').retrieve()
+    assert len(ema_server.requests) == n_requests
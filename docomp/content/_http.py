@@ -0,0 +1,230 @@
+"""
+Includes classes and functions to fetch data over HTTP.
+"""
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import urljoin, urlsplit
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+CHUNK_SIZE = 2**16
+
+
+class HTTPError(Exception):
+    """Exception raised for unsuccessful HTTP responses."""
+
+    def __init__(self, url, status):
+        self.url = url
+        self.status = status
+        super(HTTPError, self).__init__(
+            f'Request to {url} failed with status {status}.'
+        )
+
+
+def get_header(headers, name):
+    """Get the value of a header regardless of the case of its name."""
+    name = name.lower()
+    for header_name, value in headers.items():
+        if header_name.lower() == name:
+            return value
+    return None
+
+
+class PartialContent(Exception):
+    """Exception raised when the body of a response is interrupted."""
+
+    def __init__(self, url, data, headers=None):
+        self.url = url
+        self.data = data
+        self.headers = headers or {}
+        super(PartialContent, self).__init__(
+            f'Response from {url} was interrupted after {len(data)} bytes.'
+        )
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of keep-alive HTTP connections per host."""
+
+    CONNECTION_CLASSES_ = {'http': HTTPConnection, 'https': HTTPSConnection}
+
+    def __init__(self, timeout=60):
+        self.timeout = timeout
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, scheme, netloc):
+        """Get an idle connection to the host or open a new one."""
+        with self._lock:
+            connections = self._connections.setdefault((scheme, netloc), [])
+            if connections:
+                return connections.pop()
+        return self.CONNECTION_CLASSES_[scheme](netloc, timeout=self.timeout)
+
+    def _release(self, scheme, netloc, connection):
+        """Return a connection to the pool."""
+        with self._lock:
+            self._connections[(scheme, netloc)].append(connection)
+
+    def request(self, url, headers=None):
+        """Send a GET request and return the status, headers and body of the
+        response."""
+        scheme, netloc, path, query, _ = urlsplit(url)
+        target = f'{path or "/"}?{query}' if query else path or '/'
+        connection = self._acquire(scheme, netloc)
+        chunks = []
+        try:
+            connection.request('GET', target, headers=headers or {})
+            response = connection.getresponse()
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            if response.length:
+                raise HTTPException('Connection closed before the end of the body.')
+        except (OSError, HTTPException):
+            connection.close()
+            if chunks:
+                raise PartialContent(url, b''.join(chunks), dict(response.getheaders()))
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(scheme, netloc, connection)
+        return response.status, dict(response.getheaders()), b''.join(chunks)
+
+    def close(self):
+        """Close all the idle connections."""
+        with self._lock:
+            for connections in self._connections.values():
+                for connection in connections:
+                    connection.close()
+            self._connections.clear()
+
+
+class RateLimiter:
+    """Limit the rate of requests per host."""
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self._next_times = {}
+
+    async def wait(self, host):
+        """Wait until a request to the host is allowed."""
+        if not self.rate:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        next_time = max(self._next_times.get(host, now), now)
+        self._next_times[host] = next_time + 1 / self.rate
+        await asyncio.sleep(next_time - now)
+
+
+class AsyncHTTPClient:
+    """Asynchronous HTTP client with connection pooling, bounded concurrency,
+    rate limiting per host, retries with exponential backoff and resumable
+    downloads.
+
+    Requests are sent through a pool of keep-alive connections by a pool of
+    ``max_connections`` threads, so that the event loop is never blocked.
+    """
+
+    def __init__(
+        self,
+        max_connections=8,
+        rate_limit=None,
+        max_retries=3,
+        backoff_factor=0.5,
+        timeout=60,
+        max_redirects=5,
+    ):
+        self.max_connections = max_connections
+        self.rate_limit = rate_limit
+        self.max_retries = max_retries
+        self.max_redirects = max_redirects
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self._pool = HTTPConnectionPool(timeout)
+        self._executor = ThreadPoolExecutor(max_connections)
+        self._rate_limiter = RateLimiter(rate_limit)
+        self._semaphore = None
+
+    async def _request(self, url, headers):
+        """Send a single rate limited request."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        async with self._semaphore:
+            await self._rate_limiter.wait(urlsplit(url).netloc)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, self._pool.request, url, headers
+            )
+
+    async def fetch(self, url, headers=None):
+        """Get the status, the headers and the body of the response of a url.
+
+        Redirections are followed up to ``max_redirects`` times. Failed
+        requests are retried and interrupted responses are resumed with range
+        requests that are conditional on the validator of the interrupted
+        response, so that a changed body is downloaded again from its start.
+        Responses to conditional requests with a 304 status are returned with
+        an empty body.
+        """
+        data, validator, headers = b'', None, dict(headers or {})
+        attempt, n_redirects = 0, 0
+        while True:
+            request_headers = (
+                {**headers, 'Range': f'bytes={len(data)}-', 'If-Range': validator}
+                if data
+                else headers
+            )
+            try:
+                status, response_headers, body = await self._request(
+                    url, request_headers
+                )
+            except PartialContent as error:
+                validator = get_header(error.headers, 'ETag') or get_header(
+                    error.headers, 'Last-Modified'
+                )
+                data = data + error.data if validator is not None else b''
+                error_to_raise = error
+            except (OSError, HTTPException) as error:
+                error_to_raise = error
+            else:
+                location = get_header(response_headers, 'Location')
+                if status in REDIRECT_STATUSES and location is not None:
+                    if n_redirects == self.max_redirects:
+                        raise HTTPError(url, status)
+                    url, data, validator = urljoin(url, location), b'', None
+                    n_redirects += 1
+                    continue
+                if status == 206 and data:
+                    return 200, response_headers, data + body
+                if 200 <= status < 300 or status == 304:
+                    return status, response_headers, body
+                error_to_raise = HTTPError(url, status)
+                if status not in RETRY_STATUSES:
+                    raise error_to_raise
+            if attempt == self.max_retries:
+                raise error_to_raise
+            await asyncio.sleep(self.backoff_factor * 2**attempt)
+            attempt += 1
+
+    async def get(self, url):
+        """Get the body of a url.
+
+        Redirections are followed, failed requests are retried and interrupted
+        responses are resumed with range requests.
+        """
+        _, _, body = await self.fetch(url)
+        return body
+
+    def close(self):
+        """Close the connections and the threads of the client."""
+        self._pool.close()
+        self._executor.shutdown()
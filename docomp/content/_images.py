@@ -0,0 +1,194 @@
+"""
+Includes classes and functions to store the images of pdf documents.
+"""
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+from hashlib import sha256
+
+from pdfminer.pdftypes import PDFStream, resolve1
+from pdfminer.psparser import LIT, PSLiteral
+
+from ._cache import FileCache
+
+
+def _resolve(value):
+    """Resolve the references, literals, strings and streams of a stream
+    attribute to plain types, so that the filters can be serialized."""
+    value = resolve1(value)
+    if isinstance(value, PSLiteral):
+        return value.name
+    if isinstance(value, bytes):
+        return value.decode('latin-1')
+    if isinstance(value, PDFStream):
+        return _resolve(value.attrs)
+    if isinstance(value, dict):
+        return {name: _resolve(item) for name, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item) for item in value]
+    return value
+
+
+def encode_stream(stream):
+    """Get the encoded payload and the filters of a pdf stream.
+
+    The payload is deciphered but not decoded, while the filters are the
+    ``(name, params)`` tuples that decode it.
+    """
+    if stream.data is not None:
+        return stream.data, []
+    data = stream.rawdata
+    if stream.decipher:
+        data = stream.decipher(stream.objid, stream.genno, data, stream.attrs)
+    filters = [
+        (_resolve(name), _resolve(params)) for name, params in stream.get_filters()
+    ]
+    return data, filters
+
+
+def decode_stream(data, filters):
+    """Decode the payload of a pdf stream with its filters."""
+    data = bytes(data)
+    if not filters:
+        return data
+    stream = PDFStream(
+        {
+            'Filter': [LIT(name) for name, _ in filters],
+            'DecodeParms': [params for _, params in filters],
+        },
+        data,
+    )
+    return stream.get_data()
+
+
+def image_key(data, filters):
+    """Generate the key of an image from its encoded payload and filters."""
+    return sha256(repr(filters).encode() + bytes(data)).hexdigest()
+
+
+class StoredImage:
+    """Reference to an image of a store that is decoded on access.
+
+    Only the key is serialized, so that references do not carry their store.
+    Unpickled references are attached to a store with ``ImageStore.attach``.
+    """
+
+    __slots__ = ('store', 'key')
+
+    def __init__(self, store, key):
+        self.store = store
+        self.key = key
+
+    def __reduce__(self):
+        return StoredImage, (None, self.key)
+
+    @property
+    def data(self):
+        """Get the decoded data of the image."""
+        if self.store is None:
+            raise ValueError(f'Image {self.key} is not attached to a store.')
+        return self.store.get(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, StoredImage) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f'StoredImage({self.key[:12]})'
+
+
+class ImageStore:
+    """Content-addressed store of the images of pdf documents.
+
+    Images are identified by the hash of their encoded payload and filters, so
+    that identical images are stored once. Payloads are kept encoded and they
+    are decoded only on access. When ``path`` is given, the payloads that
+    exceed ``max_memory_size`` bytes are spilled to files in ``path`` and they
+    are memory-mapped on access. Pickled stores carry the payloads that are
+    kept in memory, while the spilled payloads stay on disk.
+    """
+
+    def __init__(self, path=None, max_memory_size=None):
+        self.path = path
+        self.max_memory_size = max_memory_size
+        self.filters_ = {}
+        self.payloads_ = {}
+        self.memory_size_ = 0
+
+    def __len__(self):
+        return len(self.filters_)
+
+    def __contains__(self, key):
+        return key in self.filters_
+
+    @property
+    def files_(self):
+        """Get the files of the spilled payloads."""
+        return None if self.path is None else FileCache(self.path)
+
+    def _spill(self):
+        """Move payloads to files until the memory size limit holds."""
+        if self.path is None or self.max_memory_size is None:
+            return
+        files = self.files_
+        while self.memory_size_ > self.max_memory_size:
+            key = next(iter(self.payloads_))
+            data = self.payloads_.pop(key)
+            if key not in files:
+                files.set(key, data)
+            self.memory_size_ -= len(data)
+
+    def add(self, stream):
+        """Add the image of a pdf stream and get its reference."""
+        return self.add_encoded(*encode_stream(stream))
+
+    def add_encoded(self, data, filters):
+        """Add an image from its encoded payload and filters and get its
+        reference."""
+        key = image_key(data, filters)
+        if key not in self.filters_:
+            self.filters_[key] = filters
+            self.payloads_[key] = data
+            self.memory_size_ += len(data)
+            self._spill()
+        return StoredImage(self, key)
+
+    def merge(self, store):
+        """Add the images of another store.
+
+        The spilled payloads of a store with the same ``path`` are shared
+        instead of being copied.
+        """
+        for key, filters in store.filters_.items():
+            if key in self.filters_:
+                continue
+            self.filters_[key] = filters
+            if key in store.payloads_ or self.path != store.path:
+                data = bytes(store.get_raw(key))
+                self.payloads_[key] = data
+                self.memory_size_ += len(data)
+        self._spill()
+        return self
+
+    def attach(self, images):
+        """Get the references of the images to this store."""
+        references = []
+        for image in images:
+            if image.key not in self.filters_:
+                raise KeyError(image.key)
+            references.append(StoredImage(self, image.key))
+        return references
+
+    def get_raw(self, key):
+        """Get the encoded payload of an image."""
+        if key in self.payloads_:
+            return self.payloads_[key]
+        if key not in self.filters_:
+            raise KeyError(key)
+        return self.files_.mmap(key)
+
+    def get(self, key):
+        """Get the decoded data of an image."""
+        return decode_stream(self.get_raw(key), self.filters_[key])
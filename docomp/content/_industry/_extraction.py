@@ -5,3 +5,132 @@ the industry's leaflet and labelling documents.
 
 # Author: Evangelos Nittis <vagos333@gmail.com>
 #         Georgios Douzas <gdouzas@icloud.com>
+
+from collections import namedtuple
+from os.path import splitext
+from xml.etree.ElementTree import iterparse
+from zipfile import ZipFile
+
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTTextContainer, LTTextLine
+
+from .._utils import BaseExtractor, ConfigAttribute, check_param
+from .._epar._extraction import BOLD, LabellingHTMLExtractor, font_flags
+from ... import CONFIG
+
+CONFIG = CONFIG['content']['industry']['extraction']['industry_extractor']
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+FALSE_VALUES = ('0', 'false', 'off')
+
+IndustryPage = namedtuple('IndustryPage', ['pageid', 'lines'])
+IndustryPage.__doc__ = """Page of an industry document.
+
+The lines are ``(text, bold)`` tuples in reading order."""
+
+
+def _is_bold_line(line):
+    """Check whether all the alphanumeric characters of a line are bold."""
+    return bool(font_flags(line) & BOLD)
+
+
+def read_pdf(path, laparams=None):
+    """Read the pages of a pdf document one at a time."""
+    for page in extract_pages(path, laparams=laparams):
+        lines = []
+        for element in page:
+            if isinstance(element, LTTextContainer):
+                text_lines = [element] if isinstance(element, LTTextLine) else element
+                for line in text_lines:
+                    lines.append((line.get_text(), _is_bold_line(line)))
+        yield IndustryPage(page.pageid, lines)
+
+
+def _is_bold_run(run):
+    """Check whether a run of a docx paragraph is bold."""
+    bold = run.find(f'{WORD_NAMESPACE}rPr/{WORD_NAMESPACE}b')
+    return bold is not None and bold.get(f'{WORD_NAMESPACE}val') not in FALSE_VALUES
+
+
+def read_docx(path):
+    """Read the pages of a docx document one at a time.
+
+    The document body is parsed incrementally and pages are delimited by the
+    explicit and the last rendered page breaks.
+    """
+    pageid, lines, body = 1, [], None
+    with ZipFile(path) as docx_file, docx_file.open('word/document.xml') as xml:
+        for event, element in iterparse(xml, events=('start', 'end')):
+            if event == 'start':
+                if element.tag == f'{WORD_NAMESPACE}body':
+                    body = element
+                continue
+            if element.tag != f'{WORD_NAMESPACE}p':
+                continue
+            texts, bold, page_break = [''], True, False
+            for run in element.iter(f'{WORD_NAMESPACE}r'):
+                run_bold = _is_bold_run(run)
+                for item in run:
+                    tag = item.tag.replace(WORD_NAMESPACE, '')
+                    if tag == 't' and item.text:
+                        texts[-1] += item.text
+                        bold = bold and (run_bold or not item.text.strip())
+                    elif tag == 'tab':
+                        texts[-1] += ' '
+                    elif tag == 'br' and item.get(f'{WORD_NAMESPACE}type') == 'page':
+                        page_break = True
+                    elif tag == 'br':
+                        texts.append('')
+                    elif tag == 'lastRenderedPageBreak':
+                        page_break = True
+            if page_break and lines:
+                yield IndustryPage(pageid, lines)
+                pageid, lines = pageid + 1, []
+            lines += [(text, bold) for text in texts if text.strip()]
+
+            # Release the parsed elements
+            if body is not None:
+                body.clear()
+    yield IndustryPage(pageid, lines)
+
+
+READERS_MAPPING = {'.pdf': read_pdf, '.docx': read_docx}
+
+
+class IndustryExtractor(BaseExtractor):
+    """Class to extract HTML from the industry's leaflet and labelling
+    documents.
+
+    Pages are consumed one at a time, so that lazy pages from ``read_pdf``
+    or ``read_docx`` are never fully materialized. Bold lines are extracted
+    as titles, like the labelling section of EPAR.
+    """
+
+    BOXES_FLOW_ = ConfigAttribute(CONFIG['boxes_flow'].get)
+    CHAR_MARGIN_ = ConfigAttribute(CONFIG['char_margin'].get, float)
+
+    def __init__(self, pages=()):
+        super(IndustryExtractor, self).__init__(pages)
+
+    @classmethod
+    def from_path(cls, path):
+        """Create an extractor of the pages of a pdf or docx document."""
+        extension = check_param(
+            'extension', splitext(str(path))[1].lower(), READERS_MAPPING
+        )
+        if extension == '.pdf':
+            laparams = LAParams(
+                boxes_flow=cls.BOXES_FLOW_, char_margin=cls.CHAR_MARGIN_
+            )
+            return cls(read_pdf(path, laparams))
+        return cls(read_docx(path))
+
+    def extract(self):
+        """Extract HTML elements."""
+        html_elements = []
+        for page in self.pages:
+            for text, bold in page.lines:
+                if text.strip() and not text.strip().isdigit():
+                    html_elements.append(
+                        LabellingHTMLExtractor._extract_element(text, bold)
+                    )
+        return ''.join(html_elements)
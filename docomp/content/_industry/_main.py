@@ -0,0 +1,67 @@
+"""
+Includes the main functions to extract content from the industry documents.
+"""
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from os import listdir
+from os.path import isfile, join, splitext
+
+from ._extraction import READERS_MAPPING, IndustryExtractor
+
+
+def extract_industry_content(path):
+    """Extract HTML content from an industry pdf or docx document."""
+    return IndustryExtractor.from_path(path).extracted_data_
+
+
+def extract_industry_contents(folder, n_jobs=None, prefetch_factor=2):
+    """Extract HTML content from the industry documents of a folder.
+
+    The pdf and docx documents of the folder are extracted concurrently on a
+    pool of ``n_jobs`` processes, with at most ``prefetch_factor`` documents
+    per process submitted at any time. The tuples ``(path, content, error)``
+    are yielded as the documents are completed, where a document that can not
+    be read or extracted is yielded with its exception as ``error`` instead of
+    stopping the other documents. Closing the generator cancels the documents
+    that are not extracted yet.
+    """
+    if not isinstance(prefetch_factor, int) or prefetch_factor < 1:
+        raise ValueError(
+            'Parameter `prefetch_factor` should be a positive integer.'
+            f'\n\nInstead {prefetch_factor} was given.'
+        )
+    paths = iter(
+        sorted(
+            join(folder, file_name)
+            for file_name in listdir(folder)
+            if splitext(file_name)[1].lower() in READERS_MAPPING
+            and isfile(join(folder, file_name))
+        )
+    )
+    max_in_flight = prefetch_factor * (os.cpu_count() if n_jobs is None else n_jobs)
+    executor = ProcessPoolExecutor(n_jobs)
+    futures = {}
+
+    def submit_extractions():
+        for path in islice(paths, max_in_flight - len(futures)):
+            futures[executor.submit(extract_industry_content, path)] = path
+
+    try:
+        submit_extractions()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = futures.pop(future)
+                error = future.exception()
+                content = future.result() if error is None else None
+                yield path, content, error
+            submit_extractions()
+
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=not futures)
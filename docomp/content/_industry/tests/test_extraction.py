@@ -1,3 +1,133 @@
 """
 Test the _extraction module.
 """
+
+from os.path import join
+from shutil import copy
+from zipfile import ZipFile
+
+import pytest
+from pdfminer.layout import LAParams
+
+from docomp.content import extract_industry_content, extract_industry_contents
+from docomp.content._industry._extraction import (
+    IndustryExtractor,
+    IndustryPage,
+    read_docx,
+    read_pdf,
+)
+
+RESOURCES_PATH = join('docomp', 'content', '_industry', 'tests', 'resources')
+PRODUCTS = ['azarga', 'evista']
+DOCUMENT_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+    'wordprocessingml/2006/main"><w:body>'
+    '<w:p><w:r><w:rPr><w:b/></w:rPr><w:t>Package leaflet</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>Evista 60 mg</w:t><w:tab/><w:t>tablets</w:t></w:r></w:p>'
+    '<w:p><w:r><w:rPr><w:b w:val="0"/></w:rPr><w:t>raloxifene</w:t>'
+    '<w:br/><w:t>hydrochloride</w:t></w:r></w:p>'
+    '<w:p><w:r><w:br w:type="page"/></w:r><w:r><w:rPr><w:b/></w:rPr>'
+    '<w:t>1. What Evista is</w:t></w:r><w:r><w:t> </w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>3</w:t></w:r></w:p>'
+    '</w:body></w:document>'
+)
+
+
+def make_docx(path):
+    """Write a docx document with two pages."""
+    with ZipFile(path, 'w') as docx_file:
+        docx_file.writestr('word/document.xml', DOCUMENT_XML)
+    return path
+
+
+@pytest.mark.parametrize('product', PRODUCTS)
+def test_read_pdf(product):
+    """Test the lazy reading of pdf pages."""
+    pages = read_pdf(join(RESOURCES_PATH, f'{product}_en_leaflet.pdf'), LAParams())
+    page = next(pages)
+    assert isinstance(page, IndustryPage)
+    assert page.pageid == 1
+    assert any(bold for _, bold in page.lines)
+    assert any(not bold for _, bold in page.lines)
+    assert [page.pageid for page in pages] == [2]
+
+
+def test_read_docx(tmp_path):
+    """Test the lazy reading of docx pages."""
+    pages = list(read_docx(make_docx(tmp_path / 'evista.docx')))
+    assert pages == [
+        IndustryPage(
+            1,
+            [
+                ('Package leaflet', True),
+                ('Evista 60 mg tablets', False),
+                ('raloxifene', False),
+                ('hydrochloride', False),
+            ],
+        ),
+        IndustryPage(2, [('1. What Evista is ', True), ('3', False)]),
+    ]
+
+
+def test_industry_extractor_docx(tmp_path):
+    """Test the industry extractor of docx documents."""
+    html = IndustryExtractor.from_path(make_docx(tmp_path / 'evista.docx'))
+    assert html.extracted_data_ == (
+        '<p><b>Package leaflet</b></p><p>Evista 60 mg tablets</p>'
+        '<p>raloxifene</p><p>hydrochloride</p><p><b>1. What Evista is</b></p>'
+    )
+
+
+@pytest.mark.parametrize('product', PRODUCTS)
+def test_industry_extractor_pdf(product):
+    """Test the industry extractor of pdf documents."""
+    html = extract_industry_content(join(RESOURCES_PATH, f'{product}_en_leaflet.pdf'))
+    assert html.startswith('<p><b>Package leaflet: Information for the')
+    assert '<p><b>4. Possible side effects</b></p>' in html
+
+
+def test_industry_extractor_wrong_extension():
+    """Test the industry extractor of unsupported documents."""
+    with pytest.raises(ValueError, match='Parameter `extension` should be one of'):
+        IndustryExtractor.from_path('evista_en_leaflet.txt')
+
+
+@pytest.mark.parametrize('prefetch_factor', [1, 2])
+def test_extract_industry_contents(prefetch_factor, tmp_path):
+    """Test the concurrent extraction of a folder of documents."""
+    for product in PRODUCTS:
+        copy(join(RESOURCES_PATH, f'{product}_en_leaflet.pdf'), tmp_path)
+    make_docx(tmp_path / 'evista_en_leaflet.docx')
+    (tmp_path / 'broken.docx').write_bytes(b'broken')
+    (tmp_path / 'notes.txt').write_text('ignored')
+    results = {
+        path: (content, error)
+        for path, content, error in extract_industry_contents(
+            tmp_path, n_jobs=1, prefetch_factor=prefetch_factor
+        )
+    }
+    assert sorted(results) == sorted(
+        join(tmp_path, file_name)
+        for file_name in [
+            'azarga_en_leaflet.pdf',
+            'broken.docx',
+            'evista_en_leaflet.docx',
+            'evista_en_leaflet.pdf',
+        ]
+    )
+    content, error = results[join(tmp_path, 'broken.docx')]
+    assert content is None and error is not None
+    content, error = results[join(tmp_path, 'evista_en_leaflet.pdf')]
+    assert error is None
+    assert content == extract_industry_content(
+        join(RESOURCES_PATH, 'evista_en_leaflet.pdf')
+    )
+
+
+def test_extract_industry_contents_prefetch_factor(tmp_path):
+    """Test the validation of the prefetch factor."""
+    with pytest.raises(
+        ValueError, match='Parameter `prefetch_factor` should be a positive integer.'
+    ):
+        next(extract_industry_contents(tmp_path, prefetch_factor=0))
@@ -0,0 +1,130 @@
+"""
+Includes classes and functions to instrument the download and extraction of
+content.
+"""
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from time import perf_counter
+
+
+class Instrumentation:
+    """Base class of instrumentation that ignores all the events.
+
+    Timing spans are emitted with ``span`` as context managers and counters,
+    i.e. bytes, pages or cache hits and misses, with ``count``. Subclasses
+    override them to record the events.
+    """
+
+    def span(self, name, **attributes):
+        """Measure the duration of a block of code."""
+        return nullcontext()
+
+    def count(self, name, value=1, **attributes):
+        """Increment a counter."""
+        pass
+
+    def replay(self, events):
+        """Emit the ``(kind, name, value, attributes)`` events that were
+        recorded in another process."""
+        pass
+
+
+class CallbackInstrumentation(Instrumentation):
+    """Instrumentation that emits the events to a callback.
+
+    The callback is called as ``callback(kind, name, value, attributes)``,
+    where ``kind`` is ``'span'`` with the duration in seconds as value or
+    ``'count'`` with the increment as value.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    @contextmanager
+    def span(self, name, **attributes):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.callback('span', name, perf_counter() - start, attributes)
+
+    def count(self, name, value=1, **attributes):
+        self.callback('count', name, value, attributes)
+
+    def replay(self, events):
+        for event in events:
+            self.callback(*event)
+
+
+class EventsRecorder(CallbackInstrumentation):
+    """Instrumentation that records the events in ``events_``, so that they
+    can be returned from a process and replayed in its caller."""
+
+    def __init__(self):
+        super(EventsRecorder, self).__init__(self._record)
+        self.events_ = []
+
+    def _record(self, kind, name, value, attributes):
+        self.events_.append((kind, name, value, attributes))
+
+
+class MetricsRecorder(CallbackInstrumentation):
+    """Instrumentation that aggregates the events by name.
+
+    The durations of the spans are collected in ``spans_`` and the totals of
+    the counters in ``counts_``.
+    """
+
+    def __init__(self):
+        super(MetricsRecorder, self).__init__(self._record)
+        self.spans_ = defaultdict(list)
+        self.counts_ = Counter()
+        self._lock = threading.Lock()
+
+    def _record(self, kind, name, value, attributes):
+        with self._lock:
+            if kind == 'span':
+                self.spans_[name].append(value)
+            else:
+                self.counts_[name] += value
+
+
+NULL_INSTRUMENTATION = Instrumentation()
+INSTRUMENTATION = ContextVar('instrumentation', default=NULL_INSTRUMENTATION)
+
+
+def get_instrumentation():
+    """Get the instrumentation of the current context."""
+    return INSTRUMENTATION.get()
+
+
+@contextmanager
+def instrument(instrumentation):
+    """Use the instrumentation for the code of the block.
+
+    The instrumentation applies to the current context, therefore it is
+    propagated to asynchronous tasks and to the download threads of
+    ``extract_epar_contents``. The events of its extraction processes are
+    recorded and replayed to the instrumentation as the documents complete.
+    """
+    token = INSTRUMENTATION.set(instrumentation)
+    try:
+        yield instrumentation
+    finally:
+        INSTRUMENTATION.reset(token)
+
+
+def span(name, **attributes):
+    """Measure the duration of a block of code with the current
+    instrumentation."""
+    return INSTRUMENTATION.get().span(name, **attributes)
+
+
+def count(name, value=1, **attributes):
+    """Increment a counter with the current instrumentation."""
+    INSTRUMENTATION.get().count(name, value, **attributes)
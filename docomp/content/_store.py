@@ -0,0 +1,280 @@
+"""
+Includes classes and functions to store the extracted content persistently.
+"""
+
+# Author: Georgios Douzas <gdouzas@icloud.com>
+
+import json
+import sqlite3
+from collections import namedtuple
+from re import compile
+
+from ._images import StoredImage, decode_stream, image_key
+
+SUBSECTION_PATTERN = compile(r'(?=<p><b>)')
+TITLE_PATTERN = compile(r'<p><b>(.*?)</b></p>')
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    product TEXT NOT NULL,
+    language TEXT NOT NULL,
+    section TEXT NOT NULL,
+    extracted INTEGER NOT NULL,
+    PRIMARY KEY (product, language, section)
+);
+CREATE TABLE IF NOT EXISTS subsections (
+    product TEXT NOT NULL,
+    language TEXT NOT NULL,
+    section TEXT NOT NULL,
+    subsection INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    html TEXT NOT NULL,
+    PRIMARY KEY (product, language, section, subsection)
+);
+CREATE INDEX IF NOT EXISTS subsections_language_section
+    ON subsections (language, section);
+CREATE TABLE IF NOT EXISTS images (
+    product TEXT NOT NULL,
+    language TEXT NOT NULL,
+    section TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (product, language, section, position)
+);
+CREATE INDEX IF NOT EXISTS images_hash ON images (hash);
+CREATE TABLE IF NOT EXISTS payloads (
+    hash TEXT PRIMARY KEY,
+    filters TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+Subsection = namedtuple(
+    'Subsection', ['product', 'language', 'section', 'subsection', 'title', 'html']
+)
+Subsection.__doc__ = """Stored subsection of the extracted content.
+
+The subsections of a section are numbered from zero and each one starts at a
+bold element, so that joining their html gives the html of the section."""
+
+
+def split_subsections(html):
+    """Split the HTML content to the subsections that start at bold
+    elements."""
+    return [subsection for subsection in SUBSECTION_PATTERN.split(html) if subsection]
+
+
+def _extract_title(html):
+    """Extract the title of a subsection or an empty string."""
+    title = TITLE_PATTERN.match(html)
+    return title.group(1) if title else ''
+
+
+def _encode_image(image):
+    """Get the hash, the encoded payload and the filters of an image."""
+    if isinstance(image, StoredImage):
+        filters = image.store.filters_[image.key]
+        return image.key, bytes(image.store.get_raw(image.key)), filters
+    return image_key(image, []), image, []
+
+
+class ContentStore:
+    """Persistent store of the extracted content backed by SQLite.
+
+    The content is stored as one row per product, language, section and
+    subsection, while the images are stored once per hash of their encoded
+    payload and they are referenced by the sections. Results of batch runs are
+    written in bulk transactions and queries iterate over the rows in batches,
+    so that the whole catalogue is never loaded in memory.
+
+    Parameters
+    ----------
+    path : str
+        The path of the database file.
+    batch_size : int, default=1000
+        The number of rows that are fetched at once by the queries.
+    """
+
+    def __init__(self, path, batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.connection_ = sqlite3.connect(path)
+        self.connection_.execute('PRAGMA journal_mode=WAL')
+        self.connection_.execute('PRAGMA synchronous=NORMAL')
+        self.connection_.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, product_language):
+        product, language = product_language
+        cursor = self.connection_.execute(
+            'SELECT 1 FROM sections WHERE product = ? AND language = ? LIMIT 1',
+            (product, language),
+        )
+        return cursor.fetchone() is not None
+
+    @property
+    def products_languages_(self):
+        """Get the stored pairs of product and language."""
+        cursor = self.connection_.execute(
+            'SELECT DISTINCT product, language FROM sections '
+            'ORDER BY product, language'
+        )
+        return cursor.fetchall()
+
+    def close(self):
+        """Close the connection to the database."""
+        self.connection_.close()
+
+    def _write(self, product, language, content):
+        """Replace the stored content of a product and language without
+        committing."""
+
+        # Prepare rows
+        sections, subsections, images, payloads = [], [], [], {}
+        for section, section_content in content.items():
+            section_html = section_content['html']
+            sections.append((product, language, section, section_html is not None))
+            for index, html in enumerate(split_subsections(section_html or '')):
+                subsections.append(
+                    (product, language, section, index, _extract_title(html), html)
+                )
+            for position, image in enumerate(section_content['images']):
+                key, data, filters = _encode_image(image)
+                images.append((product, language, section, position, key))
+                payloads[key] = (key, json.dumps(filters), data)
+
+        # Replace rows
+        connection = self.connection_
+        previous_keys = connection.execute(
+            'SELECT DISTINCT hash FROM images WHERE product = ? AND language = ?',
+            (product, language),
+        ).fetchall()
+        for table in ('sections', 'subsections', 'images'):
+            connection.execute(
+                f'DELETE FROM {table} WHERE product = ? AND language = ?',
+                (product, language),
+            )
+        connection.executemany('INSERT INTO sections VALUES (?, ?, ?, ?)', sections)
+        connection.executemany(
+            'INSERT INTO subsections VALUES (?, ?, ?, ?, ?, ?)', subsections
+        )
+        connection.executemany('INSERT INTO images VALUES (?, ?, ?, ?, ?)', images)
+        connection.executemany(
+            'INSERT OR IGNORE INTO payloads VALUES (?, ?, ?)', payloads.values()
+        )
+
+        # Remove payloads that are no longer referenced
+        connection.executemany(
+            'DELETE FROM payloads WHERE hash = ? AND NOT EXISTS '
+            '(SELECT 1 FROM images WHERE images.hash = payloads.hash)',
+            previous_keys,
+        )
+
+    def write(self, product, language, content):
+        """Write the extracted content of a product and language.
+
+        The content is the mapping from section to HTML and images that is
+        returned by ``extract_epar_content`` and it replaces any stored content
+        of the product and language. Sections without extracted HTML, i.e.
+        with ``None`` HTML, are stored without subsections.
+        """
+        with self.connection_:
+            self._write(product, language, content)
+        return self
+
+    def write_many(self, results, commit_size=100):
+        """Write the results of a batch run in bulk.
+
+        The results are the ``(product, language, content, error)`` tuples of
+        ``extract_epar_contents`` and they are committed every
+        ``commit_size`` documents. The tuples ``(product, language, error)``
+        of the failed documents are returned.
+        """
+        errors, n_uncommitted = [], 0
+        try:
+            for product, language, content, error in results:
+                if error is not None:
+                    errors.append((product, language, error))
+                    continue
+                self._write(product, language, content)
+                n_uncommitted += 1
+                if n_uncommitted == commit_size:
+                    self.connection_.commit()
+                    n_uncommitted = 0
+        finally:
+            self.connection_.commit()
+        return errors
+
+    def _iter_rows(self, query, params):
+        """Iterate over the rows of a query in batches."""
+        cursor = self.connection_.execute(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def iter_subsections(self, product=None, language=None, section=None):
+        """Iterate over the stored subsections that match the given product,
+        language and section.
+
+        Parameters that are ``None`` match any value. The subsections are
+        ordered by product, language, section and subsection number.
+        """
+        filters = {'product': product, 'language': language, 'section': section}
+        filters = {name: value for name, value in filters.items() if value is not None}
+        conditions = [f'{name} = ?' for name in filters]
+        where = f'WHERE {" AND ".join(conditions)} ' if conditions else ''
+        query = (
+            f'SELECT * FROM subsections {where}'
+            'ORDER BY product, language, section, subsection'
+        )
+        for row in self._iter_rows(query, list(filters.values())):
+            yield Subsection(*row)
+
+    def get(self, key):
+        """Get the decoded data of an image."""
+        row = self.connection_.execute(
+            'SELECT data, filters FROM payloads WHERE hash = ?', (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        data, filters = row
+        return decode_stream(data, json.loads(filters))
+
+    def read(self, product, language):
+        """Read the extracted content of a product and language.
+
+        The content is returned in the format of ``extract_epar_content``,
+        where the images are references that are decoded on access.
+        """
+        if (product, language) not in self:
+            raise KeyError((product, language))
+        extracted = dict(
+            self._iter_rows(
+                'SELECT section, extracted FROM sections '
+                'WHERE product = ? AND language = ?',
+                (product, language),
+            )
+        )
+        content = {section: {'html': [], 'images': []} for section in extracted}
+        for subsection in self.iter_subsections(product, language):
+            content[subsection.section]['html'].append(subsection.html)
+        for section, key in self._iter_rows(
+            'SELECT section, hash FROM images WHERE product = ? AND language = ? '
+            'ORDER BY section, position',
+            (product, language),
+        ):
+            content[section]['images'].append(StoredImage(self, key))
+        for section, section_content in content.items():
+            section_content['html'] = (
+                ''.join(section_content['html']) if extracted[section] else None
+            )
+        return content
@@ -4,8 +4,10 @@ Includes utilities functions and classes.
 
 # Author: Georgios Douzas <gdouzas@icloud.com>
 
+import threading
 from abc import abstractmethod
-from functools import cached_property
+from functools import cached_property, partial, wraps
+from time import monotonic
 
 
 def check_param(param_name, param, available_params):
@@ -27,6 +29,77 @@ def check_param(param_name, param, available_params):
     return param
 
 
+def single_flight(func=None, ttl=None):
+    """Cache the results of a function per arguments and compute each of them
+    once, even when it is requested concurrently by many threads.
+
+    Concurrent calls with the same arguments wait for the first one instead of
+    computing the result again, while calls with other arguments proceed. The
+    results expire after ``ttl`` seconds, where ``ttl`` is a number, ``None``
+    for results that never expire or a callable that returns them, so that it
+    can be resolved from the configuration.
+    """
+    if func is None:
+        return partial(single_flight, ttl=ttl)
+    results, locks, locks_lock = {}, {}, threading.Lock()
+
+    def get_result(args):
+        if args not in results:
+            return None
+        timestamp, result = results[args]
+        max_age = ttl() if callable(ttl) else ttl
+        if max_age is not None and monotonic() - timestamp > max_age:
+            return None
+        return result,
+
+    @wraps(func)
+    def wrapper(*args):
+        with locks_lock:
+            result = get_result(args)
+            if result is not None:
+                return result[0]
+            lock = locks.setdefault(args, threading.Lock())
+        with lock:
+            with locks_lock:
+                result = get_result(args)
+            if result is not None:
+                return result[0]
+            try:
+                result = func(*args)
+                with locks_lock:
+                    results[args] = monotonic(), result
+            finally:
+                with locks_lock:
+                    if locks.get(args) is lock:
+                        del locks[args]
+            return result
+
+    def cache_clear():
+        with locks_lock:
+            results.clear()
+
+    wrapper.cache_clear = cache_clear
+    wrapper.locks_ = locks
+    return wrapper
+
+
+class ConfigAttribute:
+    """Class attribute resolved lazily from the configuration.
+
+    The value is the result of ``resolve(*args)`` and it is computed on first
+    access instead of class definition time.
+    """
+
+    def __init__(self, resolve, *args):
+        self.resolve = resolve
+        self.args = args
+
+    def __get__(self, obj, owner=None):
+        if not hasattr(self, 'value_'):
+            self.value_ = self.resolve(*self.args)
+        return self.value_
+
+
 class BaseDownloader:
     """Base class to download data."""
 
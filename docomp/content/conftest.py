@@ -0,0 +1,142 @@
+"""
+Fixtures for the tests of the content subpackage.
+"""
+
+import threading
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os.path import join
+from pathlib import Path
+
+import pytest
+
+RESOURCES_PATH = join('docomp', 'content', '_epar', 'tests', 'resources')
+
+
+def etag(body):
+    """Generate the entity tag of a body."""
+    return f'"{sha256(body).hexdigest()}"'
+
+
+class HTTPRequestHandler(BaseHTTPRequestHandler):
+    """Handler of a local HTTP server that serves files from memory.
+
+    It supports keep-alive connections, range requests conditional on
+    ``If-Range``, HEAD requests with an ``ETag`` validator and conditional
+    requests with ``If-None-Match``. Paths can be redirected with a 302 status.
+    Responses to a path can be made to fail with a 503 status or to be
+    interrupted after half of the body a number of times, after which the body
+    of the path can be replaced.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        server = self.server
+        server.requests.append((self.command, self.path, dict(self.headers)))
+        if self.path not in server.files:
+            self._send(404)
+            return
+        body = server.files[self.path]
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag(body))
+        self.end_headers()
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.command, self.path, dict(self.headers)))
+        if self.path in server.redirects:
+            self._send(302, headers={'Location': server.redirects[self.path]})
+            return
+        if self.path not in server.files:
+            self._send(404)
+            return
+        if server.failures.get(self.path):
+            server.failures[self.path] -= 1
+            self._send(503)
+            return
+        body = server.files[self.path]
+        if self.headers.get('If-None-Match') == etag(body):
+            self._send(304, headers={'ETag': etag(body)})
+            return
+        status = 200
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if range_header is not None and if_range in (None, etag(body)):
+            start = int(range_header.replace('bytes=', '').split('-')[0])
+            body, status = body[start:], 206
+        if server.interruptions.get(self.path):
+            server.interruptions[self.path] -= 1
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag(server.files[self.path]))
+            self.end_headers()
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            if self.path in server.replacements:
+                server.files[self.path] = server.replacements.pop(self.path)
+            return
+        self._send(status, body, {'ETag': etag(server.files[self.path])})
+
+
+@pytest.fixture
+def http_server():
+    """Local HTTP server serving the files of its ``files`` mapping.
+
+    The ``(method, path, headers)`` tuples of the received requests are
+    recorded in its ``requests`` list.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), HTTPRequestHandler)
+    server.files = {}
+    server.requests = []
+    server.failures = {}
+    server.interruptions = {}
+    server.redirects = {}
+    server.replacements = {}
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def local_pdfs(monkeypatch):
+    """Resolve the download urls of the EPAR pdfs to local pdfs.
+
+    The fixture is a function of the path of the pdfs relative to the
+    resources of the EPAR tests, which is formatted with the product and the
+    language of each downloader. The downloaders of products without a local
+    pdf raise a ``ValueError``.
+    """
+
+    def resolve_local_pdfs(path=join('extraction', '{product}_{language}.pdf')):
+        def download_url(self):
+            pdf_path = Path(
+                RESOURCES_PATH,
+                path.format(product=self.product, language=self.language),
+            )
+            if not pdf_path.exists():
+                raise ValueError(f'Product {self.product} has no local pdf.')
+            return pdf_path.resolve().as_uri()
+
+        monkeypatch.setattr(
+            'docomp.content._epar._downloading.EPARDownloader.download_url_',
+            property(download_url),
+        )
+
+    return resolve_local_pdfs
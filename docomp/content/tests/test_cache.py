@@ -0,0 +1,90 @@
+"""
+Test the _cache module.
+"""
+
+import os
+from io import BytesIO
+
+import pytest
+
+from docomp.content._cache import FileCache, hash_key
+
+
+def test_hash_key():
+    """Test the generation of cache keys."""
+    assert hash_key('url', None, 10.0) == hash_key('url', None, 10.0)
+    assert hash_key('url', None, 10.0) != hash_key('url', 0.5, 10.0)
+
+
+@pytest.mark.parametrize('data', [b'', b'data'])
+def test_file_cache_get_set(data, tmp_path):
+    """Test the storage and retrieval of entries."""
+    cache = FileCache(str(tmp_path / 'cache'))
+    assert cache.get('key') is None
+    assert 'key' not in cache
+    cache.set('key', data)
+    assert 'key' in cache
+    assert cache.get('key') == data
+    cache.set('file', BytesIO(data))
+    assert cache.get('file') == data
+
+
+def test_file_cache_eviction(tmp_path):
+    """Test the eviction of the least recently used entries."""
+    cache = FileCache(str(tmp_path), max_size=10)
+    for key in ('first', 'second'):
+        cache.set(key, b'12345')
+        os.utime(tmp_path / key, ns=(0, {'first': 1, 'second': 2}[key]))
+    cache.get('first')
+    cache.set('third', b'12345')
+    assert sorted(os.listdir(tmp_path)) == ['first', 'third']
+
+
+def test_file_cache_eviction_scans(tmp_path, monkeypatch):
+    """Test that the directory is scanned only when the size limit is
+    exceeded."""
+    scans = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, 'scandir', lambda path: scans.append(path) or scandir(path))
+    cache = FileCache(str(tmp_path), max_size=10)
+    for key in ('first', 'second', 'first'):
+        FileCache(str(tmp_path), max_size=10).set(key, b'12345')
+    assert len(scans) == 1
+    cache.set('third', b'12345')
+    assert len(scans) == 2 and len(os.listdir(tmp_path)) == 2
+
+
+def test_file_cache_get_evicted(tmp_path, monkeypatch):
+    """Test the access of an entry that is evicted while it is read."""
+    cache = FileCache(str(tmp_path))
+    cache.set('key', b'data')
+
+    def mock_utime(path):
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, 'utime', mock_utime)
+    assert cache.get('key') == b'data'
+    assert cache.get('key') is None
+
+
+@pytest.mark.parametrize('data', [b'', b'data'])
+def test_file_cache_mmap(data, tmp_path):
+    """Test the memory-mapping of entries."""
+    cache = FileCache(str(tmp_path))
+    assert cache.mmap('key') is None
+    cache.set('key', data)
+    assert cache.mmap('key')[:] == data
+
+
+def test_file_cache_set_failure(tmp_path):
+    """Test that no temporary file is left behind when a write fails."""
+
+    class FailingFile:
+        def read(self, size=-1):
+            raise OSError()
+
+    cache = FileCache(str(tmp_path))
+    with pytest.raises(OSError):
+        cache.set('key', FailingFile())
+    assert os.listdir(tmp_path) == []
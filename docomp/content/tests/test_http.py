@@ -0,0 +1,100 @@
+"""
+Test the _http module.
+"""
+
+import asyncio
+from hashlib import sha256
+
+import pytest
+
+from docomp.content._http import AsyncHTTPClient, HTTPConnectionPool, HTTPError
+
+DATA = bytes(range(256)) * 1000
+
+
+def test_connection_pool_keep_alive(http_server):
+    """Test that connections are reused."""
+    http_server.files['/data'] = DATA
+    pool = HTTPConnectionPool()
+    for _ in range(3):
+        status, _, body = pool.request(f'{http_server.base_url}/data')
+        assert status == 200 and body == DATA
+    assert sum(len(connections) for connections in pool._connections.values()) == 1
+    pool.close()
+
+
+@pytest.mark.parametrize('failures,interruptions', [(0, 0), (2, 0), (0, 2), (1, 1)])
+def test_async_client_retries(failures, interruptions, http_server):
+    """Test the retries and the resumption of interrupted downloads."""
+    http_server.files['/data'] = DATA
+    http_server.failures['/data'] = failures
+    http_server.interruptions['/data'] = interruptions
+    client = AsyncHTTPClient(backoff_factor=0.0)
+    assert asyncio.run(client.get(f'{http_server.base_url}/data')) == DATA
+    client.close()
+    range_requests = [
+        headers for _, _, headers in http_server.requests if 'Range' in headers
+    ]
+    assert len(range_requests) == interruptions
+
+
+def test_async_client_resume_changed(http_server):
+    """Test that an interrupted download of a changed body restarts from its
+    start."""
+    http_server.files['/data'] = DATA
+    http_server.interruptions['/data'] = 1
+    http_server.replacements['/data'] = DATA[::-1]
+    client = AsyncHTTPClient(backoff_factor=0.0)
+    status, _, body = asyncio.run(client.fetch(f'{http_server.base_url}/data'))
+    client.close()
+    assert status == 200 and body == DATA[::-1]
+    _, _, headers = http_server.requests[-1]
+    assert headers['Range'] == f'bytes={len(DATA) // 2}-'
+    assert headers['If-Range'] == f'"{sha256(DATA).hexdigest()}"'
+
+
+def test_async_client_redirects(http_server):
+    """Test that redirections are followed through the pool of their host."""
+    port = http_server.server_address[1]
+    http_server.files['/data'] = DATA
+    http_server.redirects['/old'] = f'http://localhost:{port}/data'
+    http_server.redirects['/loop'] = '/loop'
+    client = AsyncHTTPClient(max_redirects=2)
+    assert asyncio.run(client.get(f'{http_server.base_url}/old')) == DATA
+    assert set(client._pool._connections) == {
+        ('http', f'127.0.0.1:{port}'),
+        ('http', f'localhost:{port}'),
+    }
+    with pytest.raises(HTTPError, match='failed with status 302.$'):
+        asyncio.run(client.get(f'{http_server.base_url}/loop'))
+    client.close()
+    assert [path for _, path, _ in http_server.requests].count('/loop') == 3
+
+
+@pytest.mark.parametrize('path,status', [('/missing', 404), ('/data', 503)])
+def test_async_client_raise_error(path, status, http_server):
+    """Test the raise of error for unsuccessful responses."""
+    http_server.files['/data'] = DATA
+    http_server.failures['/data'] = 10
+    client = AsyncHTTPClient(max_retries=2, backoff_factor=0.0)
+    with pytest.raises(HTTPError, match=f'failed with status {status}.$'):
+        asyncio.run(client.get(f'{http_server.base_url}{path}'))
+    client.close()
+    assert len(http_server.requests) == (1 if status == 404 else 3)
+
+
+def test_async_client_rate_limit(http_server):
+    """Test the rate limiting of requests per host."""
+    http_server.files['/data'] = b'data'
+    client = AsyncHTTPClient(rate_limit=20.0)
+
+    async def get_many():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(
+            *[client.get(f'{http_server.base_url}/data') for _ in range(5)]
+        )
+        return loop.time() - start
+
+    assert asyncio.run(get_many()) >= 0.2
+    client.close()
@@ -0,0 +1,110 @@
+"""
+Test the _images module.
+"""
+
+import pickle
+import zlib
+
+import pytest
+from pdfminer.pdftypes import PDFStream
+from pdfminer.psparser import LIT
+
+from docomp.content._images import ImageStore, StoredImage, decode_stream, encode_stream
+
+DATA = b'image data' * 100
+
+
+def make_stream(data=DATA, compressed=True):
+    """Create a pdf stream of an image."""
+    if compressed:
+        return PDFStream({'Filter': LIT('FlateDecode')}, zlib.compress(data))
+    return PDFStream({}, data)
+
+
+@pytest.mark.parametrize('compressed', [True, False])
+def test_encode_decode_stream(compressed):
+    """Test the encoding and decoding of pdf streams."""
+    data, filters = encode_stream(make_stream(compressed=compressed))
+    assert filters == ([('FlateDecode', {})] if compressed else [])
+    assert decode_stream(data, filters) == DATA
+    stream = make_stream(compressed=compressed)
+    stream.get_data()
+    assert encode_stream(stream) == (DATA, [])
+
+
+def test_image_store_deduplication():
+    """Test that identical images are stored once."""
+    store = ImageStore()
+    images = [store.add(make_stream()) for _ in range(3)]
+    other_image = store.add(make_stream(b'other image'))
+    assert len(store) == 2
+    assert images[0] == images[1] == images[2] != other_image
+    assert isinstance(images[0], StoredImage) and images[0].key in store
+    assert store.memory_size_ == len(zlib.compress(DATA)) + len(
+        zlib.compress(b'other image')
+    )
+    assert images[0].data == DATA and other_image.data == b'other image'
+
+
+def test_image_store_decoding(monkeypatch):
+    """Test that images are decoded only on access."""
+    decoded = []
+    monkeypatch.setattr(
+        'docomp.content._images.decode_stream',
+        lambda data, filters: decoded.append(data) or data,
+    )
+    store = ImageStore()
+    image = store.add(make_stream())
+    assert not decoded
+    image.data
+    assert len(decoded) == 1
+
+
+def test_image_store_spill(tmp_path):
+    """Test the spill of payloads to memory-mapped files."""
+    store = ImageStore(str(tmp_path), max_memory_size=len(zlib.compress(DATA)))
+    image = store.add(make_stream())
+    assert not list(tmp_path.iterdir())
+    other_image = store.add(make_stream(b'other image'))
+    assert [path.name for path in tmp_path.iterdir()] == [image.key]
+    assert image.key not in store.payloads_
+    assert store.get_raw(image.key)[:] == zlib.compress(DATA)
+    assert image.data == DATA and other_image.data == b'other image'
+    with pytest.raises(KeyError):
+        store.get_raw('missing')
+
+
+def test_image_store_pickle(tmp_path):
+    """Test that stored images are serialized without their store and that
+    they are attached to the unpickled store."""
+    store = ImageStore(str(tmp_path), max_memory_size=len(DATA))
+    images = [store.add(make_stream()) for _ in range(2)]
+    images += [store.add(make_stream(b'other image', compressed=False))]
+    for index in range(50):
+        store.add(make_stream(f'image {index}'.encode() * 100))
+    assert len(pickle.dumps(images)) < 1000
+    loaded_images = pickle.loads(pickle.dumps(images))
+    assert loaded_images == images
+    assert all(image.store is None for image in loaded_images)
+    with pytest.raises(ValueError, match='is not attached to a store.$'):
+        loaded_images[0].data
+    loaded_store = pickle.loads(pickle.dumps(store))
+    loaded_images = loaded_store.attach(loaded_images)
+    assert loaded_images[0].store is loaded_images[2].store is loaded_store
+    assert [image.data for image in loaded_images] == [DATA, DATA, b'other image']
+    with pytest.raises(KeyError):
+        ImageStore().attach(images)
+
+
+@pytest.mark.parametrize('shared_path', [True, False])
+def test_image_store_merge(shared_path, tmp_path):
+    """Test the merge of the images of another store."""
+    store = ImageStore(str(tmp_path / 'store'), max_memory_size=0)
+    image = store.add(make_stream())
+    other_store = ImageStore(
+        str(tmp_path / ('store' if shared_path else 'other')), max_memory_size=0
+    )
+    images = [other_store.add(make_stream()), other_store.add(make_stream(b'other'))]
+    assert store.merge(other_store) is store and len(store) == 2
+    assert [image.data for image in store.attach(images)] == [DATA, b'other']
+    assert image.data == DATA
@@ -0,0 +1,82 @@
+"""
+Test the _instrumentation module.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+import pytest
+
+from docomp.content import (
+    CallbackInstrumentation,
+    Instrumentation,
+    MetricsRecorder,
+    instrument,
+)
+from docomp.content._instrumentation import (
+    EventsRecorder,
+    count,
+    get_instrumentation,
+    span,
+)
+
+
+def test_null_instrumentation():
+    """Test that the default instrumentation ignores the events."""
+    instrumentation = get_instrumentation()
+    assert type(instrumentation) is Instrumentation
+    with span('stage'):
+        count('pages', 2)
+
+
+def test_callback_instrumentation():
+    """Test the emission of the events to a callback."""
+    events = []
+    instrumentation = CallbackInstrumentation(lambda *event: events.append(event))
+    with instrument(instrumentation):
+        assert get_instrumentation() is instrumentation
+        with span('stage', product='evista'):
+            count('pages', 2, product='evista')
+    assert type(get_instrumentation()) is Instrumentation
+    (kind, name, value, attributes), (span_kind, span_name, duration, _) = events
+    assert (kind, name, value, attributes) == (
+        'count',
+        'pages',
+        2,
+        {'product': 'evista'},
+    )
+    assert (span_kind, span_name) == ('span', 'stage') and duration >= 0
+
+
+def test_callback_instrumentation_error():
+    """Test that spans are emitted when the block raises an error."""
+    events = []
+    with instrument(CallbackInstrumentation(lambda *event: events.append(event))):
+        with pytest.raises(ValueError):
+            with span('stage'):
+                raise ValueError()
+    assert [event[:2] for event in events] == [('span', 'stage')]
+
+
+def test_metrics_recorder():
+    """Test the aggregation of the events across threads."""
+    with instrument(MetricsRecorder()) as recorder:
+        with ThreadPoolExecutor(4) as executor:
+            for _ in range(10):
+                executor.submit(copy_context().run, count, 'pages', 3)
+        with span('stage'):
+            pass
+    assert recorder.counts_ == {'pages': 30}
+    assert len(recorder.spans_['stage']) == 1
+
+
+def test_events_recorder_replay():
+    """Test the replay of the recorded events to another instrumentation."""
+    with instrument(EventsRecorder()) as events_recorder:
+        with span('stage', product='evista'):
+            count('pages', 2)
+    get_instrumentation().replay(events_recorder.events_)
+    with instrument(MetricsRecorder()) as recorder:
+        get_instrumentation().replay(events_recorder.events_)
+    assert recorder.counts_ == {'pages': 2}
+    assert recorder.spans_['stage'] == [events_recorder.events_[1][2]]
@@ -0,0 +1,162 @@
+"""
+Test the _store module.
+"""
+
+import zlib
+
+import pytest
+from pdfminer.pdftypes import PDFStream
+from pdfminer.psparser import LIT
+
+from docomp.content import ContentStore, extract_epar_content, extract_epar_contents
+from docomp.content._images import ImageStore, StoredImage
+from docomp.content._store import Subsection, split_subsections
+
+HTML = (
+    '<p>Intro</p><p><b>1. NAME</b></p><p>Evista</p>'
+    '<p><b>2. SUBSTANCE</b></p><p>raloxifene</p><p>60 mg</p>'
+)
+
+
+def make_content(language='en', image_data=b'image'):
+    """Create the extracted content of a document."""
+    store = ImageStore()
+    image = store.add(
+        PDFStream({'Filter': LIT('FlateDecode')}, zlib.compress(image_data))
+    )
+    return {
+        'labelling': {
+            'html': HTML.replace('Evista', f'Evista {language}'),
+            'images': [],
+        },
+        'leafleat': {'html': '<p><b>LEAFLET</b></p>', 'images': [image, b'raw']},
+    }
+
+
+def test_split_subsections():
+    """Test the split of HTML content to subsections."""
+    subsections = split_subsections(HTML)
+    assert subsections == [
+        '<p>Intro</p>',
+        '<p><b>1. NAME</b></p><p>Evista</p>',
+        '<p><b>2. SUBSTANCE</b></p><p>raloxifene</p><p>60 mg</p>',
+    ]
+    assert ''.join(subsections) == HTML
+    assert split_subsections('') == []
+
+
+def test_content_store_write_read(tmp_path):
+    """Test the round trip of the extracted content."""
+    path = str(tmp_path / 'content.db')
+    with ContentStore(path) as store:
+        store.write('evista', 'en', make_content())
+        store.write('evista', 'en', make_content(image_data=b'new image'))
+        assert (
+            store.connection_.execute('SELECT COUNT(*) FROM payloads').fetchone()[0]
+            == 2
+        )
+    with ContentStore(path) as store:
+        assert ('evista', 'en') in store and ('evista', 'fr') not in store
+        assert store.products_languages_ == [('evista', 'en')]
+        content = store.read('evista', 'en')
+        assert content['labelling'] == {
+            'html': HTML.replace('Evista', 'Evista en'),
+            'images': [],
+        }
+        assert content['leafleat']['html'] == '<p><b>LEAFLET</b></p>'
+        image, raw_image = content['leafleat']['images']
+        assert isinstance(image, StoredImage)
+        assert image.data == b'new image' and raw_image.data == b'raw'
+        with pytest.raises(KeyError):
+            store.read('evista', 'fr')
+
+
+def test_content_store_decode_parms(tmp_path):
+    """Test the storage of images with literals, strings and streams in their
+    decoding parameters."""
+    image = ImageStore().add(
+        PDFStream(
+            {
+                'Filter': LIT('FlateDecode'),
+                'DecodeParms': {
+                    'Predictor': 1,
+                    'Colors': LIT('DeviceGray'),
+                    'Key': b'\xff',
+                    'Globals': PDFStream({'Length': 0}, b''),
+                },
+            },
+            zlib.compress(b'image'),
+        )
+    )
+    content = {'leafleat': {'html': '<p><b>LEAFLET</b></p>', 'images': [image]}}
+    with ContentStore(str(tmp_path / 'content.db')) as store:
+        store.write('evista', 'en', content)
+        (image,) = store.read('evista', 'en')['leafleat']['images']
+        assert image.data == b'image'
+
+
+def test_content_store_write_many(tmp_path):
+    """Test the bulk writes and the queries of the subsections."""
+    error = ValueError('Parameter `language` should be one of en.')
+    results = [
+        ('evista', 'en', make_content('en'), None),
+        ('evista', 'de', make_content('de'), None),
+        ('azarga', 'de', make_content('de'), None),
+        ('azarga', 'it', None, error),
+    ]
+    with ContentStore(str(tmp_path / 'content.db'), batch_size=2) as store:
+        assert store.write_many(iter(results), commit_size=2) == [
+            ('azarga', 'it', error)
+        ]
+        assert store.products_languages_ == [
+            ('azarga', 'de'),
+            ('evista', 'de'),
+            ('evista', 'en'),
+        ]
+        assert (
+            store.connection_.execute('SELECT COUNT(*) FROM payloads').fetchone()[0]
+            == 2
+        )
+        subsections = list(store.iter_subsections(language='de', section='labelling'))
+        assert [
+            (subsection.product, subsection.title) for subsection in subsections
+        ] == [
+            ('azarga', ''),
+            ('azarga', '1. NAME'),
+            ('azarga', '2. SUBSTANCE'),
+            ('evista', ''),
+            ('evista', '1. NAME'),
+            ('evista', '2. SUBSTANCE'),
+        ]
+        assert subsections[1] == Subsection(
+            'azarga',
+            'de',
+            'labelling',
+            1,
+            '1. NAME',
+            '<p><b>1. NAME</b></p><p>Evista de</p>',
+        )
+        assert len(list(store.iter_subsections())) == 12
+        assert len(list(store.iter_subsections('evista'))) == 8
+
+
+def test_content_store_extracted_content(tmp_path, local_pdfs):
+    """Test the round trip of the content of the extraction pipeline."""
+
+    local_pdfs()
+
+    content = extract_epar_content('azarga', 'en')
+    assert content['leafleat']['html'] is None
+    with ContentStore(str(tmp_path / 'content.db')) as store:
+        store.write('azarga', 'en', content)
+        assert store.read('azarga', 'en') == content
+        products_languages = [('azarga', 'en'), ('evista', 'en')]
+        errors = store.write_many(extract_epar_contents(products_languages, n_jobs=1))
+        assert not errors and store.products_languages_ == products_languages
+        for product, language in products_languages:
+            stored_content = store.read(product, language)
+            expected_content = extract_epar_content(product, language)
+            assert stored_content == expected_content
+            assert [
+                image.data for image in stored_content['leafleat']['images']
+            ] == [image.data for image in expected_content['leafleat']['images']]
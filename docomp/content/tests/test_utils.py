@@ -2,9 +2,17 @@
 Test the _utils module.
 """
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
-from docomp.content._utils import BaseDownloader, BaseExtractor, check_param
+from docomp.content._utils import (
+    BaseDownloader,
+    BaseExtractor,
+    check_param,
+    single_flight,
+)
 
 
 class Downloader(BaseDownloader):
@@ -65,6 +73,47 @@ def test_check_param(param):
             check_param('param', param, available_params)
 
 
+def test_single_flight():
+    """Test that concurrent calls compute the result once per arguments."""
+    calls = []
+
+    @single_flight
+    def compute(value):
+        calls.append(value)
+        time.sleep(0.05)
+        return value * 2
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(compute, [1, 2] * 8))
+    assert results == [2, 4] * 8
+    assert sorted(calls) == [1, 2]
+    assert not compute.locks_
+    compute.cache_clear()
+    assert compute(1) == 2 and calls.count(1) == 2
+
+
+def test_single_flight_ttl(monkeypatch):
+    """Test the expiry of the cached results."""
+    now = [0.0]
+    monkeypatch.setattr('docomp.content._utils.monotonic', lambda: now[0])
+    calls = []
+
+    @single_flight(ttl=lambda: 10)
+    def compute(value):
+        calls.append(value)
+        if value is None:
+            raise ValueError()
+        return value * 2
+
+    assert compute(1) == 2 and compute(1) == 2 and calls == [1]
+    now[0] = 11.0
+    assert compute(1) == 2 and calls == [1, 1]
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            compute(None)
+    assert calls == [1, 1, None, None] and not compute.locks_
+
+
 @pytest.mark.parametrize('data', ['test', None])
 def test_base_downloader(data):
     """Test the download method and downloaded data."""
@@ -0,0 +1,64 @@
+"""
+Test the lazy loading of the package.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ['pandas', 'pdfminer', 'confuse']
+
+
+def import_package(statement):
+    """Run an import statement in a new interpreter and return the cumulative
+    import time in microseconds and the loaded heavy modules."""
+    code = (
+        f'{statement}\n'
+        'import sys\n'
+        f'print(*[module for module in {HEAVY_MODULES} if module in sys.modules])'
+    )
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit():
+                import_times[name.strip()] = int(cumulative)
+    return import_times, process.stdout.split()
+
+
+@pytest.mark.parametrize('package', ['docomp', 'docomp.content', 'docomp.comparison'])
+def test_import_time(package):
+    """Test that importing the packages does not load heavy dependencies."""
+    import_times, loaded_modules = import_package(f'import {package}')
+    assert loaded_modules == []
+    assert import_times[package] < 200000
+
+
+def test_lazy_attributes():
+    """Test that the lazy attributes load their dependencies."""
+    _, loaded_modules = import_package(
+        'import docomp.content\n'
+        'docomp.content.extract_epar_content\n'
+        'docomp.CONFIG["content"].get()'
+    )
+    assert loaded_modules == HEAVY_MODULES
+
+
+def test_lazy_attributes_raise_error():
+    """Test the raise of error for missing attributes."""
+    import docomp
+    import docomp.content
+
+    assert 'CONFIG' in dir(docomp) and 'content' in dir(docomp)
+    assert 'extract_epar_content' in dir(docomp.content)
+    with pytest.raises(AttributeError, match="has no attribute 'missing'"):
+        docomp.missing
+    with pytest.raises(AttributeError, match="has no attribute 'missing'"):
+        docomp.content.missing
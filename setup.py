@@ -17,7 +17,7 @@ with codecs.open('README.rst', encoding='utf-8-sig') as f:
 URL = 'https://github.com/georgedouzas/document-comparison.git'
 DOWNLOAD_URL = 'https://github.com/georgedouzas/document-comparison.git'
 VERSION = __version__
-INSTALL_REQUIRES = ['pandas>=1.1.0', 'xlrd>=1.0.0', 'beautifulsoup4>=4.9.1', 'pdfminer.six>=20200726', 'confuse>=1.3.0']
+INSTALL_REQUIRES = ['pandas>=1.1.0', 'numpy>=1.17.0', 'scipy>=1.4.0', 'xlrd>=1.0.0', 'pdfminer.six>=20200726', 'confuse>=1.3.0']
 CLASSIFIERS = ['Intended Audience :: Developers',
                'Programming Language :: Python',
                'Topic :: Software Development',
@@ -32,7 +32,8 @@ CLASSIFIERS = ['Intended Audience :: Developers',
 EXTRAS_REQUIRE = {
     'tests': [
         'pytest',
-        'pytest-cov'],
+        'pytest-cov',
+        'beautifulsoup4>=4.9.1'],
 }
 
 setup(
@@ -44,7 +45,7 @@ setup(
     long_description=LONG_DESCRIPTION,
     zip_safe=False,
     classifiers=CLASSIFIERS,
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks']),
     install_requires=INSTALL_REQUIRES,
     extras_require=EXTRAS_REQUIRE
 )